@@ -2,7 +2,10 @@
 # Imports
 #----------------------------------------------------------------------------#
 import dateutil.parser
+import babel
 import babel.dates
+from datetime import datetime
+from functools import lru_cache, partial
 import logging
 from logging import Formatter, FileHandler
 from flask import (
@@ -13,11 +16,18 @@ from flask import (
     redirect, 
     url_for
 )
+from flask.json import JSONEncoder as FlaskJSONEncoder
 from flask_wtf import Form
 
 from models import Venue, Artist, Show
 from routes import register_blueprints
-from extensions import db, csrf, migrate
+from commands import register_commands
+from extensions import db, csrf, migrate, fragment_cache
+from conditional import conditional_get
+from home import widgets_html
+from genres import GENRE_NAMES
+from config import get_config
+from instrumentation import instrumentation
 from forms import *
 #----------------------------------------------------------------------------#
 # App Config.
@@ -27,35 +37,63 @@ from forms import *
 # TODO Implement Show and Artist models, and complete all model relationships and properties, as a database migration.
 
 app = Flask(__name__)
-app.config.from_object('config')
+app.config.from_object(get_config())
 
 db.init_app(app)
 migrate.init_app(app, db)
 csrf.init_app(app)
+fragment_cache.init_app(app)
+instrumentation.init_app(app)
 
 register_blueprints(app)
+register_commands(app)
 
 #----------------------------------------------------------------------------#
 # Filters.
 #----------------------------------------------------------------------------#
 
-def format_datetime(value, format='medium'):
-  date = dateutil.parser.parse(value)
-  if format == 'full':
-      format="EEEE MMMM, d, y 'at' h:mma"
-  elif format == 'medium':
-      format="EE MM, dd, y h:mma"
-  return babel.dates.format_datetime(date, format, locale='en')
+DATETIME_FORMATS = {
+  'full': "EEEE MMMM, d, y 'at' h:mma",
+  'medium': "EE MM, dd, y h:mma"
+}
+
+@lru_cache(maxsize=None)
+def datetime_formatter(format, locale):
+  # compiled Babel pattern bound to its parsed Locale, built once per pair
+  pattern = babel.dates.parse_pattern(DATETIME_FORMATS.get(format, format))
+  return partial(pattern.apply, locale=babel.Locale.parse(locale))
+
+@lru_cache(maxsize=4096)
+def parse_datetime(value):
+  return dateutil.parser.parse(value)
+
+def format_datetime(value, format='medium', locale='en'):
+  # accepts datetime objects, and ISO strings for older callers
+  if isinstance(value, str):
+      value = parse_datetime(value)
+  return datetime_formatter(format, locale)(value)
 
 app.jinja_env.filters['datetime'] = format_datetime
+app.jinja_env.globals['genre_names'] = GENRE_NAMES
+
+class JSONEncoder(FlaskJSONEncoder):
+  # keeps the ISO strings the JSON variants returned before routes switched
+  # to passing datetime objects
+  def default(self, o):
+      if isinstance(o, datetime):
+          return o.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+      return super().default(o)
+
+app.json_encoder = JSONEncoder
 
 #----------------------------------------------------------------------------#
 # Controllers.
 #----------------------------------------------------------------------------#
 
 @app.route('/')
+@conditional_get(Venue, Artist, Show)
 def index():
-  return render_template('pages/home.html')
+  return render_template('pages/home.html', widgets_html=widgets_html())
 
 @app.errorhandler(404)
 def not_found_error(error):
@@ -66,7 +104,7 @@ def server_error(error):
     return render_template('errors/500.html'), 500
 
 
-if not app.debug:
+if not app.debug and not app.testing:
     file_handler = FileHandler('error.log')
     file_handler.setFormatter(
         Formatter('%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]')
@@ -0,0 +1,196 @@
+# Autocomplete.
+#----------------------------------------------------------------------------#
+# Venue and artist names are kept in an in-process prefix trie, one per model,
+# built from the table on first use. Every word of a name is a key, so "hop"
+# finds "The Musical Hop". Committed ORM inserts, renames and deletes are
+# applied to the trie in place; bulk loads call invalidate(), and bulk
+# query.update()/delete() statements drop the trie. It is also rebuilt after
+# AUTOCOMPLETE_MAX_AGE seconds, which bounds how long changes made by other
+# worker processes take to show up.
+import re
+import threading
+from bisect import bisect_left
+import time
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from extensions import db
+from models import Venue, Artist
+
+MODELS = {"venue": Venue, "artist": Artist}
+
+class TrieNode:
+    __slots__ = ('children', 'ids', 'top')
+
+    def __init__(self):
+        self.children = {}
+        # {id: key is the whole name} for the keys ending here
+        self.ids = {}
+        # best entries of the whole subtree, in result order
+        self.top = []
+
+class PrefixTrie:
+    # Results are ordered by (name does not start with the prefix, lower-cased
+    # name, id). A key's entry is (key is not the whole name, name.lower(), id),
+    # so that order is plain tuple order, and every node keeps the first
+    # 2 * top_k entries of its subtree: an id has at most two distinct entries
+    # below a node, so top_k distinct ids are always among them and a lookup
+    # never walks the subtree. Larger limits fall back to a full scan.
+    def __init__(self, top_k=10):
+        self.size = 2 * top_k
+        self.root = TrieNode()
+        self.names = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def keys(name):
+        # the name from each word onwards, lower-cased
+        name = (name or '').lower()
+        return {name[match.start():] for match in re.finditer(r'\w+', name)}
+
+    def _entry(self, entity_id, first):
+        return (not first, self.names[entity_id].lower(), entity_id)
+
+    def add(self, entity_id, name):
+        with self._lock:
+            self._remove(entity_id)
+            self.names[entity_id] = name
+            lowered = (name or '').lower()
+            for key in self.keys(name):
+                entry = self._entry(entity_id, key == lowered)
+                node = self.root
+                path = [node]
+                for char in key:
+                    child = node.children.get(char)
+                    if child is None:
+                        child = node.children[char] = TrieNode()
+                    node = child
+                    path.append(node)
+                node.ids[entity_id] = key == lowered
+                # leaf first: an entry that misses a node's list misses the
+                # lists of all its ancestors too
+                for node in reversed(path):
+                    position = bisect_left(node.top, entry)
+                    if position >= self.size:
+                        break
+                    if node.top[position:position + 1] != [entry]:
+                        node.top.insert(position, entry)
+                        del node.top[self.size:]
+
+    def remove(self, entity_id):
+        with self._lock:
+            self._remove(entity_id)
+
+    def _remove(self, entity_id):
+        if entity_id not in self.names:
+            return
+        paths = []
+        for key in self.keys(self.names[entity_id]):
+            path = [(None, None, self.root)]
+            for char in key:
+                path.append((path[-1][2], char, path[-1][2].children[char]))
+            path[-1][2].ids.pop(entity_id, None)
+            paths.append(path)
+        del self.names[entity_id]
+
+        # Refill the lists that held the id from the leaves up. A node whose
+        # list does not hold the id is unaffected, and so are its ancestors on
+        # that key; an ancestor refilled from a branch not yet walked still
+        # holds the id and is refilled again when that branch is.
+        for path in paths:
+            for parent, char, node in reversed(path):
+                if not any(entry[2] == entity_id for entry in node.top):
+                    break
+                self._refill(node)
+                # prune the branch back to the last node still in use
+                if parent is not None and not node.ids and not node.children:
+                    parent.children.pop(char, None)
+
+    def _refill(self, node):
+        entries = {self._entry(entity_id, first) for entity_id, first in node.ids.items()}
+        for child in node.children.values():
+            entries.update(child.top)
+        node.top = sorted(entries)[:self.size]
+
+    def complete(self, prefix, limit=10):
+        # [(id, name)] of up to limit names with a word starting with prefix;
+        # names starting with the prefix come first, then alphabetical.
+        prefix = prefix.lower()
+        with self._lock:
+            node = self.root
+            for char in prefix:
+                node = node.children.get(char)
+                if node is None:
+                    return []
+
+            if 2 * limit <= self.size:
+                entries = node.top
+            else:
+                entries = []
+                stack = [node]
+                while stack:
+                    node = stack.pop()
+                    entries.extend(self._entry(entity_id, first) for entity_id, first in node.ids.items())
+                    stack.extend(node.children.values())
+                entries.sort()
+
+            matches = []
+            seen = set()
+            for _, _, entity_id in entries:
+                if entity_id not in seen:
+                    seen.add(entity_id)
+                    matches.append((entity_id, self.names[entity_id]))
+                    if len(matches) == limit:
+                        break
+            return matches
+
+_tries = {}
+
+def _trie(model):
+    max_age = current_app.config.get('AUTOCOMPLETE_MAX_AGE', 300)
+    entry = _tries.get(model)
+    if entry is None or time.monotonic() - entry[1] > max_age:
+        trie = PrefixTrie(current_app.config.get('AUTOCOMPLETE_LIMIT', 10))
+        for entity_id, name in db.session.query(model.id, model.name):
+            trie.add(entity_id, name)
+        entry = _tries[model] = (trie, time.monotonic())
+    return entry[0]
+
+def invalidate(model):
+    _tries.pop(model, None)
+
+def complete(kind, prefix, limit=10):
+    return _trie(MODELS[kind]).complete(prefix, limit)
+
+# Changes are collected per session at flush and applied once committed, so
+# a rolled back write never reaches the trie.
+@event.listens_for(Session, 'after_flush')
+def _collect_changes(session, flush_context):
+    pending = session.info.setdefault('autocomplete_changes', [])
+    for target in session.new | session.dirty:
+        if type(target) in (Venue, Artist):
+            pending.append((type(target), target.id, target.name))
+    for target in session.deleted:
+        if type(target) in (Venue, Artist):
+            pending.append((type(target), target.id, None))
+
+@event.listens_for(Session, 'after_commit')
+def _apply_changes(session):
+    for model, entity_id, name in session.info.pop('autocomplete_changes', []):
+        entry = _tries.get(model)
+        if entry is None:
+            continue
+        if name is None:
+            entry[0].remove(entity_id)
+        else:
+            entry[0].add(entity_id, name)
+
+@event.listens_for(Session, 'after_bulk_update')
+@event.listens_for(Session, 'after_bulk_delete')
+def _invalidate_bulk(context):
+    # query.update() / query.delete() do not go through the flush
+    invalidate(context.mapper.class_)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('autocomplete_changes', None)
@@ -0,0 +1,72 @@
+# Bookings.
+#----------------------------------------------------------------------------#
+# A show occupies its venue for SHOW_SLOT_MINUTES from start_time, and two
+# shows at one venue may not overlap. Slots all have the same length, so an
+# overlap is any other show at the venue starting less than one slot before
+# or after: a range scan on the (venue_id, start_time) index, or a bisect over
+# a venue's sorted start times. On PostgreSQL the ex_Show_venue_slot exclusion
+# constraint enforces the same rule for concurrent writers.
+#
+# The slot length is fixed rather than a setting: the constraint bakes it into
+# the schema, so changing SHOW_SLOT_MINUTES needs a migration rebuilding
+# ex_Show_venue_slot with the new interval.
+from bisect import bisect_left, insort
+from datetime import timedelta
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import Show
+
+EXCLUSION_CONSTRAINT = 'ex_Show_venue_slot'
+SHOW_SLOT_MINUTES = 180
+
+def slot_length():
+    return timedelta(minutes=SHOW_SLOT_MINUTES)
+
+def find_conflict(venue_id, start_time):
+    # The start_time of a show at the venue overlapping a new show at
+    # start_time, or None.
+    slot = slot_length()
+    return db.session.query(Show.start_time)\
+        .filter(Show.venue_id == venue_id)\
+        .filter(Show.start_time > start_time - slot)\
+        .filter(Show.start_time < start_time + slot)\
+        .order_by(Show.start_time)\
+        .limit(1)\
+        .scalar()
+
+def is_conflict_error(error):
+    # A concurrent booking that lost the race against the exclusion constraint
+    if not isinstance(error, IntegrityError):
+        return False
+    return getattr(error.orig, 'pgcode', None) == '23P01' or EXCLUSION_CONSTRAINT in str(error.orig)
+
+class BookingIndex:
+    # In-memory equivalent of find_conflict for bulk loads: each venue's start
+    # times are read once (in index order) and kept sorted, so every check and
+    # insert is a bisect and rows within one import are checked against each
+    # other as well.
+    def __init__(self, slot=None):
+        self.slot = slot or slot_length()
+        self._starts = {}
+
+    def _venue(self, venue_id):
+        starts = self._starts.get(venue_id)
+        if starts is None:
+            rows = db.session.query(Show.start_time)\
+                .filter(Show.venue_id == venue_id)\
+                .order_by(Show.start_time)
+            starts = self._starts[venue_id] = [row[0] for row in rows]
+        return starts
+
+    def conflict(self, venue_id, start_time):
+        starts = self._venue(venue_id)
+        i = bisect_left(starts, start_time - self.slot)
+        # skip a show ending exactly when this one starts
+        if i < len(starts) and starts[i] == start_time - self.slot:
+            i += 1
+        if i < len(starts) and starts[i] < start_time + self.slot:
+            return starts[i]
+        return None
+
+    def add(self, venue_id, start_time):
+        insort(self._venue(venue_id), start_time)
@@ -0,0 +1,150 @@
+# Fragment cache.
+#----------------------------------------------------------------------------#
+# Rendered page fragments are stored under '<kind>:<id>:v<version>'. Writes
+# bump the entity's version counter, so stale fragments are never looked up
+# again and simply age out of the backend.
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from markupsafe import Markup
+
+class LRUBackend:
+    # In-process backend: least recently used entries are evicted past
+    # max_entries, and entries expire after their TTL. Version counters are
+    # kept apart from the LRU so they are never evicted (an evicted counter
+    # would restart at 0 and resurrect an old fragment).
+    def __init__(self, max_entries=1024, default_ttl=300):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+class RedisBackend:
+    # Works with any client exposing the redis-py get / set(ex=) / incr calls,
+    # so an in-memory fake can stand in for a server.
+    def __init__(self, client, prefix='fyyur:', default_ttl=300):
+        self.client = client
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        self.client.set(self.prefix + key, value, ex=ttl or None)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+class NullBackend:
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def incr(self, key):
+        return 0
+
+def create_backend(config):
+    name = config.get('FRAGMENT_CACHE_BACKEND', 'lru')
+    ttl = config.get('FRAGMENT_CACHE_TTL', 300)
+    if name == 'lru':
+        return LRUBackend(config.get('FRAGMENT_CACHE_MAX_ENTRIES', 1024), ttl)
+    if name == 'redis':
+        import redis
+        return RedisBackend(redis.Redis.from_url(config['FRAGMENT_CACHE_REDIS_URL']), default_ttl=ttl)
+    if name is None or name == 'null':
+        return NullBackend()
+    raise ValueError(f'Unknown FRAGMENT_CACHE_BACKEND {name!r}')
+
+class FragmentCache:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, backend=None):
+        app.extensions['fragment_cache'] = {
+            "backend": backend or create_backend(app.config),
+            "hits": 0,
+            "misses": 0
+        }
+
+    @property
+    def _state(self):
+        return current_app.extensions['fragment_cache']
+
+    @property
+    def backend(self):
+        return self._state["backend"]
+
+    def stats(self):
+        state = self._state
+        return {"hits": state["hits"], "misses": state["misses"]}
+
+    def version(self, kind, entity_id):
+        return int(self.backend.get(f'{kind}:{entity_id}:version') or 0)
+
+    def bump(self, kind, *entity_ids):
+        for entity_id in entity_ids:
+            self.backend.incr(f'{kind}:{int(entity_id)}:version')
+
+    def get_or_render(self, kind, entity_id, render, ttl=None, part=None, html=True):
+        # render() is only called on a miss; exceptions (e.g. a 404 abort)
+        # propagate and nothing is cached. Fragments with a part name share
+        # the entity's version, so one bump invalidates all of them. Rendered
+        # HTML comes back as Markup; html=False caches plain text (a name for
+        # a title) and returns it as str, so templates still escape it.
+        wrap = Markup if html else str
+        state = self._state
+        key = f'{kind}:{entity_id}:v{self.version(kind, entity_id)}'
+        if part is not None:
+            key = f'{key}:{part}'
+        fragment = state["backend"].get(key)
+        if fragment is not None:
+            state["hits"] += 1
+            return wrap(fragment)
+
+        state["misses"] += 1
+        fragment = str(render())
+        state["backend"].set(key, fragment, ttl)
+        return wrap(fragment)
@@ -0,0 +1,15 @@
+from .importer import import_command
+from .exporter import export_command
+from .counters import counters_cli
+from .seed import seed_command
+from .bench import bench_command, bench_forms_command
+from .genres import genres_cli
+
+def register_commands(app):
+    app.cli.add_command(import_command)
+    app.cli.add_command(export_command)
+    app.cli.add_command(counters_cli)
+    app.cli.add_command(seed_command)
+    app.cli.add_command(bench_command)
+    app.cli.add_command(bench_forms_command)
+    app.cli.add_command(genres_cli)
@@ -0,0 +1,154 @@
+#  Load benchmark
+#  ----------------------------------------------------------------
+#  flask seed --venues 1000 --artists 5000 --shows 100000
+#  flask bench --requests 50
+#
+#  Requests every read route through the Flask test client (no network or
+#  server in the way) and reports p50/p95 latency and SQL statements per
+#  request. Run it against databases seeded at different scales (1k, 100k,
+#  1M shows) to see how each route grows, or with GENRE_STORAGE=array
+#  (PostgreSQL) and =table to compare the genre filters with the default
+#  'mask'. The first request of each route is a warm-up and is not counted.
+import math
+import random
+import time
+from urllib.parse import quote
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import event
+from models import Venue, Artist
+from extensions import db
+from genres import GENRE_NAMES
+from forms import VenueForm, ArtistForm, build_form
+from .seed import venue_row, artist_row
+from .importer import to_formdata
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+def sample_ids(model, rng, count):
+    ids = [row[0] for row in db.session.query(model.id).order_by(model.id).limit(10000)]
+    if not ids:
+        raise click.ClickException(f'No {model.__tablename__} rows; run flask seed first.')
+    return [rng.choice(ids) for _ in range(count)]
+
+def sample_terms(model, rng, count):
+    names = [row[0] for row in db.session.query(model.name).order_by(model.id).limit(1000) if row[0]]
+    return [rng.choice(rng.choice(names).split())[:4] for _ in range(count)]
+
+def routes(rng, count):
+    # (label, method, [url or (url, form data)] per request)
+    venue_ids = sample_ids(Venue, rng, count)
+    artist_ids = sample_ids(Artist, rng, count)
+    venue_terms = sample_terms(Venue, rng, count)
+    artist_terms = sample_terms(Artist, rng, count)
+    genre_names = [quote(rng.choice(GENRE_NAMES)) for _ in range(count)]
+    genre_pairs = [quote(','.join(rng.sample(GENRE_NAMES, 2))) for _ in range(count)]
+    return [
+        ('index', 'get', ['/'] * count),
+        ('venue.venues', 'get', ['/venues'] * count),
+        ('venue.venues?genre', 'get', [f'/venues?genre={name}' for name in genre_names]),
+        ('venue.show_venue', 'get', [f'/venues/{venue_id}' for venue_id in venue_ids]),
+        ('venue.search_venues', 'post', [('/venues/search', {"search_term": term}) for term in venue_terms]),
+        ('artist.artists', 'get', ['/artists'] * count),
+        ('artist.artists?genre', 'get', [f'/artists?genre={name}&match=all' for name in genre_pairs]),
+        ('artist.show_artist', 'get', [f'/artists/{artist_id}' for artist_id in artist_ids]),
+        ('artist.search_artists', 'post', [('/artists/search', {"search_term": term}) for term in artist_terms]),
+        ('show.shows', 'get', ['/shows'] * count),
+        ('search.search', 'get', [f'/search?search_term={term}' for term in venue_terms]),
+        ('api.list_venues', 'get', ['/api/v1/venues?fields=id,name'] * count),
+        ('api.list_shows', 'get', ['/api/v1/shows?fields=id,start_time,venue_name,artist_name'] * count),
+        ('autocomplete.autocomplete', 'get', [f'/api/autocomplete?type=artist&q={term}' for term in artist_terms]),
+    ]
+
+@click.command('bench')
+@click.option('--requests', 'count', default=20, show_default=True, help='Timed requests per route.')
+@click.option('--route', 'only', multiple=True, help='Only benchmark these endpoints (repeatable).')
+@click.option('--seed', default=42, show_default=True, help='Random seed for the sampled ids and search terms.')
+@with_appcontext
+def bench_command(count, only, seed):
+    """Report p50/p95 latency and SQL statements per request for each route."""
+    rng = random.Random(seed)
+    app = current_app._get_current_object()
+    client = app.test_client()
+    statements = [0]
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements[0] += 1
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count_statement)
+    try:
+        click.echo(f'{"endpoint":<28}{"p50 ms":>10}{"p95 ms":>10}{"max ms":>10}{"sql/req":>10}')
+        for label, method, requests in routes(rng, count + 1):
+            if only and label not in only:
+                continue
+            timings = []
+            sql = []
+            for number, target in enumerate(requests):
+                url, data = target if isinstance(target, tuple) else (target, None)
+                statements[0] = 0
+                started = time.perf_counter()
+                response = getattr(client, method)(url, data=data)
+                response.get_data()
+                elapsed = time.perf_counter() - started
+                if response.status_code >= 500:
+                    raise click.ClickException(f'{method.upper()} {url} returned {response.status_code}')
+                if number:
+                    timings.append(elapsed * 1000)
+                    sql.append(statements[0])
+            click.echo(f'{label:<28}{percentile(timings, 0.5):>10.2f}{percentile(timings, 0.95):>10.2f}'
+                       f'{max(timings):>10.2f}{sum(sql) / len(sql):>10.1f}')
+    finally:
+        event.remove(engine, 'before_cursor_execute', count_statement)
+
+#  Form benchmark
+#  ----------------------------------------------------------------
+#  flask bench-forms --forms 5000
+#
+#  Builds and validates VenueForm/ArtistForm from synthetic rows (one in ten
+#  with an unknown state or genre) and reports forms per second, both for
+#  plain construction and for forms.build_form. Needs no database rows.
+
+def form_samples(rng, row_factory, count):
+    samples = []
+    for number in range(count):
+        row = row_factory(rng, number)
+        if number % 10 == 9:
+            if rng.random() < 0.5:
+                row["state"] = 'ZZ'
+            else:
+                row["genres"] = row["genres"] + ['Polka']
+        samples.append(to_formdata(row))
+    return samples
+
+@click.command('bench-forms')
+@click.option('--forms', 'count', default=5000, show_default=True, help='Forms built per measurement.')
+@click.option('--seed', default=42, show_default=True, help='Random seed for the sampled rows.')
+@with_appcontext
+def bench_forms_command(count, seed):
+    """Report construction and validation throughput of the venue and artist forms."""
+    rng = random.Random(seed)
+    builders = (
+        ('construct', lambda form_class, formdata: form_class(formdata=formdata, meta={'csrf': False})),
+        ('build_form', build_form),
+    )
+
+    click.echo(f'{"form":<14}{"builder":<12}{"validate":<10}{"forms/s":>12}{"us/form":>10}{"valid":>8}')
+    for form_class, row_factory in ((VenueForm, venue_row), (ArtistForm, artist_row)):
+        samples = form_samples(rng, row_factory, count)
+        for label, builder in builders:
+            builder(form_class, samples[0]).validate()
+            for validate in (False, True):
+                valid = 0
+                started = time.perf_counter()
+                for formdata in samples:
+                    form = builder(form_class, formdata)
+                    if validate and form.validate():
+                        valid += 1
+                elapsed = time.perf_counter() - started
+                click.echo(f'{form_class.__name__:<14}{label:<12}{"yes" if validate else "no":<10}'
+                           f'{count / elapsed:>12.0f}{elapsed / count * 1e6:>10.1f}'
+                           f'{valid if validate else "-":>8}')
@@ -0,0 +1,43 @@
+#  Show counters
+#  ----------------------------------------------------------------
+#  flask counters rollover       (run periodically, e.g. every few minutes)
+#  flask counters check [--fix]
+import click
+from flask.cli import AppGroup
+from models import Venue, Artist
+from extensions import db
+import counters
+
+counters_cli = AppGroup('counters', help='Maintain the denormalized upcoming/past show counters.')
+
+@counters_cli.command('rollover')
+def rollover_command():
+    """Move shows that have started since the last run from upcoming to past."""
+    try:
+        moved = counters.rollover()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    click.echo(f'Rolled over {moved} shows.')
+
+@counters_cli.command('check')
+@click.option('--fix', is_flag=True, help='Rewrite the counters that disagree with the Show table.')
+def check_command(fix):
+    """Compare the stored counters with the Show table."""
+    total = 0
+    for model in (Venue, Artist):
+        mismatches = counters.reconcile(model)
+        total += len(mismatches)
+        for entity_id, stored, expected in mismatches:
+            click.echo(f'{model.__name__} {entity_id}: stored upcoming/past {stored}, actual {expected}')
+        if fix and mismatches:
+            counters.recount(model, [entity_id for entity_id, _, _ in mismatches])
+
+    if fix and total:
+        db.session.commit()
+        click.echo(f'Fixed {total} counters.')
+    elif total:
+        raise click.ClickException(f'{total} counters are out of date; rerun with --fix.')
+    else:
+        click.echo('All counters match.')
@@ -0,0 +1,102 @@
+#  Bulk export
+#  ----------------------------------------------------------------
+#  flask export shows --format csv --watermark shows.watermark.json
+#
+#  Rows are read through a server-side cursor in --batch-size chunks and
+#  written straight to a gzip-compressed JSONL or CSV snapshot. With a
+#  watermark (--since / --after-id, or a --watermark file kept between runs)
+#  only rows changed since the previous export are written.
+import csv
+import gzip
+import json
+import os
+import time
+from datetime import datetime
+import click
+from flask.cli import with_appcontext
+from models import Venue, Artist, Show
+from extensions import db
+
+EXPORTS = {
+    "venues": Venue,
+    "artists": Artist,
+    "shows": Show
+}
+
+def to_cell(value):
+    # CSV cells use the same conventions the importer reads back
+    if isinstance(value, list):
+        return ','.join(value)
+    if isinstance(value, datetime):
+        # the format ShowForm's DateTimeField parses
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return value
+
+def read_watermark(path):
+    if not path or not os.path.exists(path):
+        return None, None
+    with open(path, encoding='utf-8') as source:
+        watermark = json.load(source)
+    since = watermark.get('updated_at')
+    return (datetime.fromisoformat(since) if since else None), watermark.get('id')
+
+def write_watermark(path, updated_at, last_id):
+    with open(path, 'w', encoding='utf-8') as target:
+        json.dump({"updated_at": updated_at.isoformat() if updated_at else None, "id": last_id}, target)
+
+@click.command('export')
+@click.argument('kind', type=click.Choice(sorted(EXPORTS)))
+@click.option('--format', 'fmt', type=click.Choice(['jsonl', 'csv']), default='jsonl', show_default=True)
+@click.option('--output', type=click.Path(dir_okay=False),
+              help='Target file (default: KIND-<timestamp>.<format>.gz).')
+@click.option('--since', type=click.DateTime(), help='Only rows with updated_at after this time.')
+@click.option('--after-id', type=int, help='Only rows with an id above this one.')
+@click.option('--watermark', 'watermark_path', type=click.Path(dir_okay=False),
+              help='JSON file holding the previous run\'s watermark; read before and updated after the export.')
+@click.option('--batch-size', default=5000, show_default=True, help='Rows fetched per cursor batch.')
+@with_appcontext
+def export_command(kind, fmt, output, since, after_id, watermark_path, batch_size):
+    """Export venues, artists or shows to a gzip-compressed JSONL or CSV snapshot."""
+    model = EXPORTS[kind]
+    columns = list(model.__table__.columns)
+    fields = [column.name for column in columns]
+
+    if since is None and after_id is None:
+        since, after_id = read_watermark(watermark_path)
+
+    query = db.session.query(*columns)
+    if since is not None:
+        query = query.filter(model.updated_at > since).order_by(model.updated_at, model.id)
+    else:
+        if after_id is not None:
+            query = query.filter(model.id > after_id)
+        query = query.order_by(model.id)
+
+    output = output or f'{kind}-{datetime.utcnow():%Y%m%dT%H%M%S}.{fmt}.gz'
+    started = time.perf_counter()
+    exported = 0
+    last_updated_at, last_id = since, after_id
+
+    with gzip.open(output, 'wt', encoding='utf-8', newline='') as target:
+        if fmt == 'csv':
+            writer = csv.writer(target)
+            writer.writerow(fields)
+        for row in query.yield_per(batch_size):
+            record = dict(zip(fields, row))
+            if fmt == 'csv':
+                writer.writerow([to_cell(value) for value in row])
+            else:
+                target.write(json.dumps(record, default=to_cell, separators=(',', ':')) + '\n')
+
+            exported += 1
+            last_id = max(last_id or 0, record['id'])
+            if last_updated_at is None or record['updated_at'] > last_updated_at:
+                last_updated_at = record['updated_at']
+            if exported % batch_size == 0:
+                click.echo(f'{exported} {kind} exported ({exported / (time.perf_counter() - started):.0f} rows/s)')
+
+    if watermark_path:
+        write_watermark(watermark_path, last_updated_at, last_id)
+
+    elapsed = time.perf_counter() - started
+    click.echo(f'Done: {exported} {kind} written to {output} in {elapsed:.1f}s.')
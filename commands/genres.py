@@ -0,0 +1,45 @@
+#  Genre links
+#  ----------------------------------------------------------------
+#  flask genres rebuild   (before switching GENRE_STORAGE to 'table')
+#  flask genres check [--fix]
+import click
+from flask.cli import AppGroup
+from models import Venue, Artist
+from extensions import db
+from genres import rebuild_links, mask_mismatches, fix_masks
+
+genres_cli = AppGroup('genres', help='Maintain the genre masks and the normalized genre lookup tables.')
+
+@genres_cli.command('rebuild')
+@click.option('--batch-size', default=5000, show_default=True, help='Rows per INSERT batch.')
+def rebuild_command(batch_size):
+    """Rewrite venue_genre and artist_genre from the genres arrays."""
+    try:
+        for model in (Venue, Artist):
+            rebuild_links(model, batch_size=batch_size)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    click.echo('Rebuilt the venue and artist genre links.')
+
+@genres_cli.command('check')
+@click.option('--fix', is_flag=True, help='Rewrite the masks that disagree with the genres arrays.')
+def check_command(fix):
+    """Compare the stored genre masks with the genres arrays."""
+    total = 0
+    for model in (Venue, Artist):
+        mismatches = mask_mismatches(model)
+        total += len(mismatches)
+        for entity_id, stored, expected in mismatches:
+            click.echo(f'{model.__name__} {entity_id}: stored genre_mask {stored}, genres give {expected}')
+        if fix and mismatches:
+            fix_masks(model, mismatches)
+
+    if fix and total:
+        db.session.commit()
+        click.echo(f'Fixed {total} genre masks.')
+    elif total:
+        raise click.ClickException(f'{total} genre masks are out of date; rerun with --fix.')
+    else:
+        click.echo('All genre masks match.')
@@ -0,0 +1,227 @@
+#  Bulk import
+#  ----------------------------------------------------------------
+#  flask import venues listings.csv --rejects rejected.jsonl
+#
+#  Rows are streamed from CSV or JSONL (optionally gzipped), validated with
+#  the same forms the create pages use, and inserted in batches with
+#  bulk_insert_mappings (a multi-row executemany on PostgreSQL).
+import csv
+import gzip
+import io
+import json
+import time
+import click
+from flask.cli import with_appcontext
+from werkzeug.datastructures import MultiDict
+from models import Venue, Artist, Show
+from forms import VenueForm, ArtistForm, ShowForm, build_form
+from enums import genre_mask
+from extensions import db, fragment_cache
+import counters
+import autocomplete
+import search
+from genres import table_storage, rebuild_links
+from bookings import BookingIndex
+from home import invalidate_widgets
+
+def optional(field):
+    # empty optional fields are stored as NULL, so exported rows import back unchanged
+    return field.data or None
+
+def venue_mapping(form):
+    return {
+        "name": form.name.data,
+        "city": form.city.data,
+        "state": form.state.data,
+        "address": form.address.data,
+        "phone": form.phone.data,
+        "genres": form.genres.data,
+        "genre_mask": genre_mask(form.genres.data),
+        "facebook_link": optional(form.facebook_link),
+        "image_link": optional(form.image_link),
+        "website_link": optional(form.website_link),
+        "seeking_talent": bool(form.seeking_talent.data),
+        "seeking_description": optional(form.seeking_description)
+    }
+
+def artist_mapping(form):
+    return {
+        "name": form.name.data,
+        "city": form.city.data,
+        "state": form.state.data,
+        "phone": form.phone.data,
+        "genres": form.genres.data,
+        "genre_mask": genre_mask(form.genres.data),
+        "facebook_link": optional(form.facebook_link),
+        "image_link": optional(form.image_link),
+        "website_link": optional(form.website_link),
+        "seeking_venues": bool(form.seeking_venue.data),
+        "seeking_description": optional(form.seeking_description)
+    }
+
+def show_mapping(form):
+    return {
+        "artist_id": form.artist_id.data,
+        "venue_id": form.venue_id.data,
+        "start_time": form.start_time.data
+    }
+
+IMPORTS = {
+    "venues": (Venue, VenueForm, venue_mapping),
+    "artists": (Artist, ArtistForm, artist_mapping),
+    "shows": (Show, ShowForm, show_mapping)
+}
+
+TRUE_VALUES = ('1', 'true', 't', 'yes', 'y', 'on')
+
+def open_source(path):
+    if path.endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(path, 'rb'), encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+def read_rows(path, fmt):
+    with open_source(path) as source:
+        if fmt == 'csv':
+            yield from csv.DictReader(source)
+        else:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+
+# model columns named differently from their form fields, as 'flask export'
+# writes them
+FIELD_NAMES = {"seeking_venues": 'seeking_venue'}
+
+def to_formdata(row):
+    # CSV cells are strings: genres are comma separated, booleans are spelled
+    # out and an empty cell is a missing value; JSONL may already carry
+    # lists, booleans and nulls.
+    formdata = MultiDict()
+    for key, value in row.items():
+        key = FIELD_NAMES.get(key, key)
+        if value is None or value == '':
+            continue
+        if key == 'genres':
+            genres = value if isinstance(value, list) else value.split(',')
+            formdata.setlist(key, [genre.strip() for genre in genres if genre.strip()])
+        elif key in ('seeking_talent', 'seeking_venue'):
+            if value is True or str(value).strip().lower() in TRUE_VALUES:
+                formdata[key] = 'y'
+        else:
+            formdata[key] = str(value)
+    return formdata
+
+class Rejects:
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = None
+
+    def write(self, line_number, row, errors):
+        if self._file is None:
+            self._file = open(self.path, 'w', encoding='utf-8')
+        self._file.write(json.dumps({"line": line_number, "row": row, "errors": errors}, default=str) + '\n')
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+def existing_ids(model):
+    return {row[0] for row in db.session.query(model.id)}
+
+def validate_row(kind, form_class, row, parents):
+    form = build_form(form_class, to_formdata(row))
+    if not form.validate():
+        return None, form.errors
+
+    if kind == 'shows':
+        errors = {}
+        for field, ids in (("artist_id", parents["artists"]), ("venue_id", parents["venues"])):
+            value = getattr(form, field).data
+            if value not in ids:
+                errors[field] = [f'No such {field[:-3]} {value!r}.']
+        if errors:
+            return None, errors
+
+        conflict = parents["bookings"].conflict(form.venue_id.data, form.start_time.data)
+        if conflict is not None:
+            return None, {"start_time": [f'Venue is already booked for a show at {conflict}.']}
+        parents["bookings"].add(form.venue_id.data, form.start_time.data)
+    return form, None
+
+@click.command('import')
+@click.argument('kind', type=click.Choice(sorted(IMPORTS)))
+@click.argument('source', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']),
+              help='Input format; inferred from the file name by default.')
+@click.option('--batch-size', default=1000, show_default=True, help='Rows per INSERT batch.')
+@click.option('--rejects', 'rejects_path', type=click.Path(dir_okay=False),
+              help='Where rejected rows are written (default: SOURCE.rejects.jsonl).')
+@with_appcontext
+def import_command(kind, source, fmt, batch_size, rejects_path):
+    """Bulk import venues, artists or shows from CSV or JSONL."""
+    model, form_class, mapping = IMPORTS[kind]
+    fmt = fmt or ('csv' if '.csv' in source.lower() else 'jsonl')
+    rejects = Rejects(rejects_path or source + '.rejects.jsonl')
+
+    # shows reference existing rows; load the id sets once instead of a
+    # lookup per row, and each venue's bookings on first use
+    parents = None
+    if kind == 'shows':
+        parents = {"artists": existing_ids(Artist), "venues": existing_ids(Venue), "bookings": BookingIndex()}
+
+    started = time.perf_counter()
+    imported = 0
+    batch = []
+
+    def flush():
+        nonlocal imported, batch
+        link_genres = kind != 'shows' and table_storage()
+        if link_genres:
+            first_id = (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+        db.session.bulk_insert_mappings(model, batch)
+        if link_genres:
+            # bulk inserts skip the ORM events that write the genre links
+            rebuild_links(model, min_id=first_id)
+        if kind == 'shows':
+            venue_ids = {row["venue_id"] for row in batch}
+            artist_ids = {row["artist_id"] for row in batch}
+            # bulk inserts skip the ORM events that maintain the show counters
+            counters.recount(Venue, venue_ids)
+            counters.recount(Artist, artist_ids)
+        db.session.commit()
+        if kind == 'shows':
+            fragment_cache.bump('venue', *venue_ids)
+            fragment_cache.bump('artist', *artist_ids)
+        else:
+            # bulk inserts skip the events that update the name indexes
+            autocomplete.invalidate(model)
+            search.invalidate(model)
+        invalidate_widgets()
+        imported += len(batch)
+        batch = []
+        elapsed = time.perf_counter() - started
+        click.echo(f'{imported} {kind} imported ({imported / elapsed:.0f} rows/s), {rejects.count} rejected')
+
+    try:
+        for line_number, row in enumerate(read_rows(source, fmt), start=1):
+            form, errors = validate_row(kind, form_class, row, parents)
+            if errors:
+                rejects.write(line_number, row, errors)
+                continue
+            batch.append(mapping(form))
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        rejects.close()
+
+    elapsed = time.perf_counter() - started
+    click.echo(f'Done: {imported} {kind} imported in {elapsed:.1f}s ({imported / max(elapsed, 1e-9):.0f} rows/s).')
+    if rejects.count:
+        click.echo(f'{rejects.count} rejected rows written to {rejects.path}')
@@ -0,0 +1,170 @@
+#  Synthetic data
+#  ----------------------------------------------------------------
+#  flask seed --venues 1000 --artists 5000 --shows 100000 --seed 42
+#
+#  Generates venues, artists and shows that pass the create forms'
+#  validators and inserts them in batches with bulk_insert_mappings. The same
+#  --seed always produces the same rows. Shows never overlap at a venue.
+import random
+import time
+from datetime import datetime, timedelta
+import click
+from flask.cli import with_appcontext
+from models import Venue, Artist, Show
+from extensions import db
+from enums import State, Genre, genre_mask
+from home import invalidate_widgets
+import autocomplete
+import search
+import counters
+from genres import table_storage, rebuild_links
+from bookings import slot_length
+
+CITIES = (
+    ('New York', State.NY), ('Brooklyn', State.NY), ('San Francisco', State.CA),
+    ('Los Angeles', State.CA), ('Oakland', State.CA), ('Chicago', State.IL),
+    ('Austin', State.TX), ('Houston', State.TX), ('Seattle', State.WA),
+    ('Portland', State.OR), ('Nashville', State.TN), ('Memphis', State.TN),
+    ('New Orleans', State.LA), ('Atlanta', State.GA), ('Denver', State.CO),
+    ('Boston', State.MA), ('Philadelphia', State.PA), ('Detroit', State.MI),
+    ('Minneapolis', State.MN), ('Miami', State.FL),
+)
+VENUE_WORDS = (
+    ('The', 'Old', 'Blue', 'Golden', 'Velvet', 'Electric', 'Rusty', 'Crimson', 'Silver', 'Wild', 'Hidden', 'Lucky'),
+    ('Musical', 'Jazz', 'Echo', 'Neon', 'Moon', 'Harbor', 'Union', 'Pine', 'Copper', 'Anchor', 'Lantern', 'Vinyl'),
+    ('Hop', 'Hall', 'Lounge', 'Room', 'Theatre', 'Club', 'Tavern', 'Ballroom', 'Garage', 'Cellar', 'Den', 'Stage'),
+)
+ARTIST_WORDS = (
+    ('Guns', 'Matt', 'The', 'Sonic', 'Midnight', 'Paper', 'Broken', 'Gentle', 'Loud', 'Young', 'Lost', 'Static'),
+    ('N', 'Wild', 'Sax', 'Black', 'Velvet', 'Cosmic', 'Little', 'Northern', 'Iron', 'Golden', 'Silent', 'Honey'),
+    ('Petals', 'Quevedo', 'Band', 'Keys', 'Wolves', 'Riders', 'Hearts', 'Collective', 'Trio', 'Lights', 'Machines', 'Kids'),
+)
+STREETS = ('Valencia St', 'Main St', 'Broadway', 'Market St', 'Elm St', 'Oak Ave', 'Sunset Blvd', '2nd Ave')
+
+def slug(name, number):
+    return '-'.join(name.lower().split()) + f'-{number}'
+
+def phone(rng):
+    return f'{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(0, 9999):04d}'
+
+def genres(rng):
+    return [genre.value for genre in rng.sample(list(Genre), rng.randint(1, 3))]
+
+def profile(rng, words, number):
+    name = ' '.join(rng.choice(choices) for choices in words)
+    city, state = rng.choice(CITIES)
+    phone_number = phone(rng)
+    names = genres(rng)
+    return {
+        "name": name,
+        "city": city,
+        "state": state.value,
+        "phone": phone_number,
+        "genres": names,
+        "genre_mask": genre_mask(names),
+        "image_link": f'https://picsum.photos/seed/{slug(name, number)}/300/300',
+        "facebook_link": f'https://www.facebook.com/{slug(name, number)}',
+        "website_link": f'https://{slug(name, number)}.example.com',
+        "seeking_description": rng.choice((None, 'Looking for new talent to play on weekends.')),
+    }
+
+def venue_row(rng, number):
+    row = profile(rng, VENUE_WORDS, number)
+    row["address"] = f'{rng.randint(1, 9999)} {rng.choice(STREETS)}'
+    row["seeking_talent"] = row["seeking_description"] is not None
+    return row
+
+def artist_row(rng, number):
+    row = profile(rng, ARTIST_WORDS, number)
+    row["seeking_venues"] = row["seeking_description"] is not None
+    return row
+
+def show_rows(rng, count, venue_ids, artist_ids, days, slot):
+    # Start times fall on slot boundaries from noon, so two shows overlap only
+    # if they share a (venue, day, slot) triple, which is never repeated.
+    slots_per_day = max(1, int(timedelta(hours=12) / slot))
+    capacity = len(venue_ids) * (2 * days) * slots_per_day
+    if count > capacity // 2:
+        raise click.ClickException(f'{count} shows do not fit in {len(venue_ids)} venues over {2 * days} days; add venues or --days.')
+
+    today = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+    taken = set()
+    while len(taken) < count:
+        booking = (rng.choice(venue_ids), rng.randint(-days, days - 1), rng.randrange(slots_per_day))
+        if booking in taken:
+            continue
+        taken.add(booking)
+        venue_id, day, index = booking
+        yield {
+            "venue_id": venue_id,
+            "artist_id": rng.choice(artist_ids),
+            "start_time": today + timedelta(days=day) + index * slot
+        }
+
+def insert(model, rows, batch_size, label):
+    started = time.perf_counter()
+    batch = []
+    inserted = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.bulk_insert_mappings(model, batch)
+            db.session.commit()
+            inserted += len(batch)
+            batch = []
+            click.echo(f'{inserted} {label} ({inserted / (time.perf_counter() - started):.0f} rows/s)')
+    if batch:
+        db.session.bulk_insert_mappings(model, batch)
+        db.session.commit()
+        inserted += len(batch)
+    click.echo(f'Inserted {inserted} {label} in {time.perf_counter() - started:.1f}s.')
+
+def chunks(ids, size):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+@click.command('seed')
+@click.option('--venues', 'venue_count', default=100, show_default=True)
+@click.option('--artists', 'artist_count', default=200, show_default=True)
+@click.option('--shows', 'show_count', default=1000, show_default=True)
+@click.option('--days', default=365, show_default=True, help='Shows start up to this many days before or after today.')
+@click.option('--seed', 'seed', default=42, show_default=True, help='Random seed; the same seed gives the same rows.')
+@click.option('--batch-size', default=5000, show_default=True, help='Rows per INSERT batch.')
+@with_appcontext
+def seed_command(venue_count, artist_count, show_count, days, seed, batch_size):
+    """Insert reproducible synthetic venues, artists and shows."""
+    rng = random.Random(seed)
+    first_venue = (db.session.query(db.func.max(Venue.id)).scalar() or 0) + 1
+    first_artist = (db.session.query(db.func.max(Artist.id)).scalar() or 0) + 1
+
+    try:
+        insert(Venue, (venue_row(rng, number) for number in range(venue_count)), batch_size, 'venues')
+        insert(Artist, (artist_row(rng, number) for number in range(artist_count)), batch_size, 'artists')
+
+        venue_ids = [row[0] for row in db.session.query(Venue.id).filter(Venue.id >= first_venue).order_by(Venue.id)]
+        artist_ids = [row[0] for row in db.session.query(Artist.id).filter(Artist.id >= first_artist).order_by(Artist.id)]
+        if show_count and (not venue_ids or not artist_ids):
+            raise click.ClickException('Shows need at least one new venue and artist.')
+        if show_count:
+            insert(Show, show_rows(rng, show_count, venue_ids, artist_ids, days, slot_length()), batch_size, 'shows')
+
+        # bulk inserts skip the ORM events that maintain the show counters
+        # and the genre links
+        for model, ids in ((Venue, venue_ids), (Artist, artist_ids)):
+            for chunk in chunks(ids, batch_size):
+                counters.recount(model, chunk)
+                db.session.commit()
+        if table_storage():
+            rebuild_links(Venue, min_id=first_venue, batch_size=batch_size)
+            rebuild_links(Artist, min_id=first_artist, batch_size=batch_size)
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    autocomplete.invalidate(Venue)
+    autocomplete.invalidate(Artist)
+    search.invalidate(Venue)
+    search.invalidate(Artist)
+    invalidate_widgets()
+    click.echo(f'Seeded {venue_count} venues, {artist_count} artists and {show_count} shows (seed {seed}).')
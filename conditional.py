@@ -0,0 +1,79 @@
+# Conditional GET.
+#----------------------------------------------------------------------------#
+# Read views are tagged with the tables they depend on. The ETag is derived
+# from max(updated_at) and count(*) of those tables (one cheap statement over
+# the updated_at indexes), so a matching If-None-Match is answered with 304
+# before the view runs its queries or renders its template. Clients that only
+# send If-Modified-Since are compared against Last-Modified: max(updated_at),
+# or the start of the current time bucket if later, since deletes do not move
+# max(updated_at) and the past/upcoming split moves with the clock. HTTP dates
+# have second resolution, so a write in the same second as the previous
+# response can go unnoticed until the next bucket.
+import hashlib
+import time
+from datetime import datetime
+from functools import wraps
+from flask import current_app, request, session, make_response
+from extensions import db
+
+def table_fingerprint(models):
+    # (last modified, [max(updated_at), count(*)] per model) in one statement
+    if not models:
+        return None, []
+    columns = []
+    for model in models:
+        columns.append(db.session.query(db.func.max(model.updated_at)).as_scalar())
+        columns.append(db.session.query(db.func.count(model.id)).as_scalar())
+    values = list(db.session.query(*columns).one())
+    timestamps = [value for value in values[::2] if value is not None]
+    return (max(timestamps) if timestamps else None), values
+
+def compute_etag(models):
+    last_modified, values = table_fingerprint(models)
+    # pages split past/upcoming shows at 'now', so validators also roll over
+    # every CONDITIONAL_GET_TIME_BUCKET seconds
+    bucket_seconds = current_app.config.get('CONDITIONAL_GET_TIME_BUCKET', 60)
+    bucket = int(time.time() // bucket_seconds)
+    key = '|'.join([
+        request.full_path,
+        str(request.accept_mimetypes.best),
+        str(bucket),
+        *[value.isoformat() if hasattr(value, 'isoformat') else str(value) for value in values]
+    ])
+    bucket_started = datetime.utcfromtimestamp(bucket * bucket_seconds)
+    if last_modified is None or last_modified < bucket_started:
+        last_modified = bucket_started
+    return hashlib.sha1(key.encode('utf-8')).hexdigest(), last_modified
+
+def not_modified(etag, last_modified):
+    # If-None-Match wins over If-Modified-Since when both are sent (RFC 7232)
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since is not None:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+def conditional_get(*models):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # pending flash messages are rendered into the page, so never
+            # answer 304 (or validate) while there are some
+            if request.method not in ('GET', 'HEAD') or session.get('_flashes'):
+                return view(*args, **kwargs)
+
+            etag, last_modified = compute_etag(models)
+            if not_modified(etag, last_modified):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            response.cache_control.no_cache = True
+            response.vary.add('Accept')
+            return response
+        return wrapper
+    return decorator
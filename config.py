@@ -1,12 +1,126 @@
 import os
-SECRET_KEY = os.urandom(32)
 # Grabs the folder where the script runs.
 basedir = os.path.abspath(os.path.dirname(__file__))
 
-# Enable debug mode.
-DEBUG = True
+def env_int(name, default):
+    return int(os.environ.get(name, default))
 
-# Connect to the database
-# TODO IMPLEMENT DATABASE URL
-SQLALCHEMY_DATABASE_URI = 'postgresql://postgres@localhost:5432'
-SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+def env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() in ('1', 'true', 'yes', 'on')
+
+def engine_options():
+    # Pool sizing is per process: with gunicorn, size it from the worker count
+    # so workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) stays under max_connections.
+    options = {
+        'pool_size': env_int('DB_POOL_SIZE', 5),
+        'max_overflow': env_int('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': env_int('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': env_bool('DB_POOL_PRE_PING', True),
+    }
+    if os.environ.get('DATABASE_URL', 'postgresql').startswith('postgresql'):
+        # psycopg2 executemany as multi-row VALUES pages (bulk imports)
+        options['executemany_mode'] = os.environ.get('DB_EXECUTEMANY_MODE', 'values')
+    statement_timeout = env_int('DB_STATEMENT_TIMEOUT_MS', 0)
+    if statement_timeout:
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    return options
+
+class Config:
+    DEBUG = False
+    TESTING = False
+    # Must be stable across processes, or sessions signed by one gunicorn
+    # worker are rejected by the others.
+    SECRET_KEY = os.environ.get('SECRET_KEY')
+
+    # Connect to the database
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'postgresql://postgres@localhost:5432')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options()
+
+    # Keyset pagination for the /artists, /venues and /shows listings
+    PAGE_SIZE = env_int('PAGE_SIZE', 50)
+    MAX_PAGE_SIZE = env_int('MAX_PAGE_SIZE', 200)
+
+    # Rows fetched per server-side cursor batch by streamed responses
+    STREAM_BATCH_SIZE = env_int('STREAM_BATCH_SIZE', 1000)
+
+    # Render /shows unpaginated from a server-side cursor (also per request
+    # with ?stream=1); TEMPLATE_STREAM_BUFFER is the number of template
+    # chunks sent per write
+    SHOWS_STREAMING = env_bool('SHOWS_STREAMING', False)
+    TEMPLATE_STREAM_BUFFER = env_int('TEMPLATE_STREAM_BUFFER', 100)
+
+    # Maximum number of rows returned per entity by the search endpoints
+    SEARCH_RESULT_LIMIT = env_int('SEARCH_RESULT_LIMIT', 50)
+
+    # Show form name pickers: at most AUTOCOMPLETE_LIMIT names per lookup; the
+    # in-process name index is rebuilt every AUTOCOMPLETE_MAX_AGE seconds
+    AUTOCOMPLETE_LIMIT = env_int('AUTOCOMPLETE_LIMIT', 10)
+    AUTOCOMPLETE_MAX_AGE = env_int('AUTOCOMPLETE_MAX_AGE', 300)
+
+    # Genre filters on /venues and /artists read the genre_mask bitmasks
+    # ('mask'), the genres ARRAY columns and their GIN indexes ('array';
+    # PostgreSQL only) or the normalized genre/venue_genre/artist_genre tables
+    # ('table'; populate them with 'flask genres rebuild' before switching)
+    GENRE_STORAGE = os.environ.get('GENRE_STORAGE', 'mask')
+
+    # Rendered fragment cache for the venue and artist detail pages.
+    # 'lru' (in-process), 'redis' (needs the redis package and FRAGMENT_CACHE_REDIS_URL) or 'null'.
+    # Past/upcoming splits can lag by up to FRAGMENT_CACHE_TTL seconds.
+    FRAGMENT_CACHE_BACKEND = os.environ.get('FRAGMENT_CACHE_BACKEND', 'lru')
+    FRAGMENT_CACHE_TTL = env_int('FRAGMENT_CACHE_TTL', 300)
+    FRAGMENT_CACHE_MAX_ENTRIES = env_int('FRAGMENT_CACHE_MAX_ENTRIES', 1024)
+    FRAGMENT_CACHE_REDIS_URL = os.environ.get('FRAGMENT_CACHE_REDIS_URL')
+
+    # Home page: HOME_WIDGET_SIZE recent venues, artists and shows this week,
+    # re-rendered at least every HOME_WIDGETS_TTL seconds
+    HOME_WIDGET_SIZE = env_int('HOME_WIDGET_SIZE', 10)
+    HOME_WIDGETS_TTL = env_int('HOME_WIDGETS_TTL', 60)
+
+    # ETags of read views also change every CONDITIONAL_GET_TIME_BUCKET seconds,
+    # since past/upcoming show splits depend on the current time
+    CONDITIONAL_GET_TIME_BUCKET = env_int('CONDITIONAL_GET_TIME_BUCKET', 60)
+
+    # Per-request SQL/template timing, Server-Timing headers and /_metrics.
+    # A statement repeated N_PLUS_ONE_THRESHOLD times in one request is logged.
+    INSTRUMENTATION_ENABLED = env_bool('INSTRUMENTATION_ENABLED', False)
+    N_PLUS_ONE_THRESHOLD = env_int('N_PLUS_ONE_THRESHOLD', 3)
+
+class DevelopmentConfig(Config):
+    # Enable debug mode.
+    DEBUG = True
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'fyyur-development-secret')
+
+class TestingConfig(Config):
+    # In-memory SQLite by default: the genres columns fall back to JSON there
+    # and search to the in-process n-gram index. Set TEST_DATABASE_URL to a
+    # PostgreSQL database for the array/trigram paths.
+    TESTING = True
+    SECRET_KEY = 'fyyur-testing-secret'
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL', 'sqlite://')
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    WTF_CSRF_ENABLED = False
+
+class ProductionConfig(Config):
+    pass
+
+config_by_name = {
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
+}
+
+def get_config(name=None):
+    # The profile comes from FYYUR_CONFIG (development, testing or production).
+    # Unset means production, so a deploy that forgets it never runs with the
+    # debugger and the public development SECRET_KEY; it fails here instead
+    # when SECRET_KEY is missing too.
+    name = name or os.environ.get('FYYUR_CONFIG', 'production')
+    if name not in config_by_name:
+        raise RuntimeError(f'Unknown FYYUR_CONFIG {name!r}, expected one of {", ".join(config_by_name)}')
+
+    config = config_by_name[name]
+    if not config.SECRET_KEY:
+        raise RuntimeError(f'SECRET_KEY must be set in the environment for the {name} config')
+    return config
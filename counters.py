@@ -0,0 +1,111 @@
+# Show counters.
+#----------------------------------------------------------------------------#
+# Venue/Artist.upcoming_shows_count and past_shows_count are denormalized from
+# the Show table relative to the ShowRollover watermark: a show is upcoming
+# while its start_time is after rolled_over_at. They are adjusted on every ORM
+# show insert/delete; rollover() moves the shows that crossed 'now' since the
+# last run, and reconcile() compares the counters with the Show table.
+# Bulk statements bypass the ORM events, so their callers use recount().
+from datetime import datetime
+from sqlalchemy import bindparam, event
+from extensions import db
+from models import Venue, Artist, Show, ShowRollover
+from queries import show_counts
+
+PARENTS = (
+    (Venue, Show.venue_id, 'venue_id'),
+    (Artist, Show.artist_id, 'artist_id')
+)
+
+def rollover_watermark(connection=None):
+    # The last rollover time; before the first rollover shows are split at now.
+    statement = db.select([ShowRollover.rolled_over_at]).order_by(ShowRollover.id).limit(1)
+    value = (connection or db.session).execute(statement).scalar()
+    return value or datetime.now()
+
+def _adjust(connection, show, delta):
+    column = 'upcoming_shows_count' if show.start_time > rollover_watermark(connection) else 'past_shows_count'
+    for model, _, attribute in PARENTS:
+        table = model.__table__
+        connection.execute(
+            table.update()
+                .where(table.c.id == getattr(show, attribute))
+                .values({column: table.c[column] + delta})
+        )
+
+@event.listens_for(Show, 'after_insert')
+def _show_inserted(mapper, connection, target):
+    _adjust(connection, target, 1)
+
+@event.listens_for(Show, 'after_delete')
+def _show_deleted(mapper, connection, target):
+    _adjust(connection, target, -1)
+
+def recount(model, ids):
+    # Recompute both counters of the given venues or artists from the Show table.
+    ids = list(ids)
+    if not ids:
+        return
+    fk_column = Show.venue_id if model is Venue else Show.artist_id
+    counts = show_counts(fk_column, rollover_watermark(), ids)
+
+    table = model.__table__
+    db.session.execute(
+        table.update()
+            .where(table.c.id == bindparam('_id'))
+            .values(upcoming_shows_count=bindparam('_upcoming'), past_shows_count=bindparam('_past')),
+        [{"_id": entity_id, "_upcoming": counts.get(entity_id, (0, 0))[0], "_past": counts.get(entity_id, (0, 0))[1]}
+         for entity_id in ids]
+    )
+
+def rollover(now=None):
+    # Move shows that started between the last rollover and now from the
+    # upcoming to the past counters, then advance the watermark. Returns the
+    # number of shows moved; the first run only sets the watermark and
+    # recounts everything.
+    if now is None:
+        now = datetime.now()
+
+    state = ShowRollover.query.order_by(ShowRollover.id).with_for_update().first()
+    if state is None:
+        state = ShowRollover(rolled_over_at=now)
+        db.session.add(state)
+        db.session.flush()
+        for model, _, _ in PARENTS:
+            recount(model, [row[0] for row in db.session.query(model.id)])
+        return 0
+
+    moved = 0
+    for model, fk_column, _ in PARENTS:
+        rows = db.session.query(fk_column, db.func.count(Show.id))\
+            .filter(Show.start_time > state.rolled_over_at)\
+            .filter(Show.start_time <= now)\
+            .group_by(fk_column)\
+            .all()
+        if not rows:
+            continue
+        table = model.__table__
+        db.session.execute(
+            table.update()
+                .where(table.c.id == bindparam('_id'))
+                .values(upcoming_shows_count=table.c.upcoming_shows_count - bindparam('_moved'),
+                        past_shows_count=table.c.past_shows_count + bindparam('_moved')),
+            [{"_id": parent_id, "_moved": count} for parent_id, count in rows]
+        )
+        if model is Venue:
+            moved = sum(count for _, count in rows)
+
+    state.rolled_over_at = now
+    return moved
+
+def reconcile(model):
+    # [(id, stored (upcoming, past), actual (upcoming, past))] for every
+    # venue or artist whose counters disagree with the Show table.
+    fk_column = Show.venue_id if model is Venue else Show.artist_id
+    actual = show_counts(fk_column, rollover_watermark())
+    mismatches = []
+    for entity_id, upcoming, past in db.session.query(model.id, model.upcoming_shows_count, model.past_shows_count):
+        expected = actual.get(entity_id, (0, 0))
+        if (upcoming, past) != expected:
+            mismatches.append((entity_id, (upcoming, past), expected))
+    return mismatches
@@ -0,0 +1,45 @@
+# Deletion.
+#----------------------------------------------------------------------------#
+# Venues and artists are removed with a single DELETE ... WHERE id IN (...);
+# their shows go with them through the ON DELETE CASCADE foreign keys, so no
+# row is loaded into the session. Bulk statements skip the ORM events, so the
+# show counters of the other side and the cached fragments are refreshed here.
+from extensions import db, fragment_cache
+from models import Venue, Artist, Show
+from home import invalidate_widgets
+import counters
+
+# model -> (fragment kind, its Show column, counterpart model, counterpart column, counterpart kind)
+SIDES = {
+    Venue: ('venue', Show.venue_id, Artist, Show.artist_id, 'artist'),
+    Artist: ('artist', Show.artist_id, Venue, Show.venue_id, 'venue')
+}
+
+def delete_entities(model, ids):
+    # Deletes the venues or artists with the given ids (and their shows) in
+    # one transaction. Returns {id: name} of the rows deleted; unknown ids
+    # are ignored.
+    kind, fk_column, counterpart_model, counterpart_column, counterpart_kind = SIDES[model]
+    ids = {int(entity_id) for entity_id in ids}
+    if not ids:
+        return {}
+
+    try:
+        names = dict(db.session.query(model.id, model.name).filter(model.id.in_(ids)))
+        if not names:
+            return {}
+        counterpart_ids = [row[0] for row in db.session.query(counterpart_column)
+                           .filter(fk_column.in_(list(names)))
+                           .distinct()]
+
+        model.query.filter(model.id.in_(list(names))).delete(synchronize_session=False)
+        counters.recount(counterpart_model, counterpart_ids)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    fragment_cache.bump(kind, *names)
+    fragment_cache.bump(counterpart_kind, *counterpart_ids)
+    invalidate_widgets()
+    return names
@@ -55,7 +55,7 @@ class State(Enum):
     
     @classmethod
     def choices(cls):
-        return [(state.value, state.value) for state in cls]
+        return STATE_CHOICES
 
 class Genre(Enum):
     ALTERNATIVE = 'Alternative'
@@ -80,12 +80,25 @@ class Genre(Enum):
     
     @classmethod
     def choices(cls):
-        return [(genre.value, genre.value) for genre in cls]
+        return GENRE_CHOICES
 
-def validate_state(self, field):
-    if field.data not in [state.value for state in State]:
-        raise ValidationError('Invalid state.')
+# Lookup tables built once at import: values in declaration order, frozen
+# sets for membership tests and (value, label) choices for the select fields.
+# STATE_VALUES is also the us_state PostgreSQL enum on Venue and Artist.
+STATE_VALUES = tuple(state.value for state in State)
+STATE_SET = frozenset(STATE_VALUES)
+STATE_CHOICES = tuple((value, value) for value in STATE_VALUES)
 
-def validate_genres(self, field):
-    if not set(field.data).issubset({genre.value for genre in Genre}):
-        raise ValidationError('Invalid genres.')
\ No newline at end of file
+GENRE_VALUES = tuple(genre.value for genre in Genre)
+GENRE_SET = frozenset(GENRE_VALUES)
+GENRE_CHOICES = tuple((value, value) for value in GENRE_VALUES)
+
+# Bit of each genre in Venue/Artist.genre_mask. Bits follow declaration
+# order, so new genres must be appended to Genre, never inserted.
+GENRE_BITS = {genre.value: 1 << index for index, genre in enumerate(Genre)}
+
+def genre_mask(names):
+    mask = 0
+    for name in names or ():
+        mask |= GENRE_BITS.get(name, 0)
+    return mask
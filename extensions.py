@@ -1,7 +1,21 @@
+import sqlite3
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from flask_wtf.csrf import CSRFProtect
 from flask_migrate import Migrate
+from cache import FragmentCache
 
 db = SQLAlchemy()
 csrf = CSRFProtect()
-migrate = Migrate()
\ No newline at end of file
+migrate = Migrate()
+fragment_cache = FragmentCache()
+
+@event.listens_for(Engine, 'connect')
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite (test runs) only enforces foreign keys, and with them the
+    # ON DELETE CASCADE on Show, when asked to per connection
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
@@ -1,9 +1,10 @@
 from datetime import datetime
+from flask import current_app
 from flask_wtf import FlaskForm as Form
-from wtforms import StringField, SelectField, SelectMultipleField, DateTimeField, BooleanField
+from wtforms import StringField, SelectField, SelectMultipleField, DateTimeField, BooleanField, IntegerField
 from wtforms.validators import DataRequired, AnyOf, URL, ValidationError, Optional
 import re
-from enums import Genre, State
+from enums import Genre, State, GENRE_SET, STATE_SET
 
 def validate_phone(form, field):
     pattern = r'^\(?([0-9]{3})\)?[-. ]?([0-9]{3})[-. ]?([0-9]{4})$'
@@ -21,12 +22,33 @@ def validate_link(form, field):
         if not field.data.startswith(('http://', 'https://')):
             raise ValidationError('Website link must start with http:// or https://')
 
+class SetSelectField(SelectField):
+    # Checks the submitted value against a frozenset instead of scanning the
+    # choices
+    def __init__(self, label=None, validators=None, values=frozenset(), **kwargs):
+        super().__init__(label, validators, **kwargs)
+        self.values = values
+
+    def pre_validate(self, form):
+        if self.data not in self.values:
+            raise ValueError(self.gettext('Not a valid choice'))
+
+class SetSelectMultipleField(SelectMultipleField):
+    def __init__(self, label=None, validators=None, values=frozenset(), **kwargs):
+        super().__init__(label, validators, **kwargs)
+        self.values = values
+
+    def pre_validate(self, form):
+        if self.data and not self.values.issuperset(self.data):
+            invalid = next(value for value in self.data if value not in self.values)
+            raise ValueError(self.gettext("'%(value)s' is not a valid choice for this field") % dict(value=invalid))
+
 class ShowForm(Form):
-    artist_id = StringField(
-        'artist_id'
+    artist_id = IntegerField(
+        'artist_id', validators=[DataRequired()]
     )
-    venue_id = StringField(
-        'venue_id'
+    venue_id = IntegerField(
+        'venue_id', validators=[DataRequired()]
     )
     start_time = DateTimeField(
         'start_time',
@@ -41,9 +63,9 @@ class VenueForm(Form):
     city = StringField(
         'city', validators=[DataRequired()]
     )
-    state = SelectField(
+    state = SetSelectField(
         'state', validators=[DataRequired()],
-        choices=State.choices()
+        choices=State.choices(), values=STATE_SET
     )
     address = StringField(
         'address', validators=[DataRequired()]
@@ -57,11 +79,10 @@ class VenueForm(Form):
         'image_link',
         validators=[Optional(), URL(), validate_link],
     )
-    genres = SelectMultipleField(
-        # TODO implement enum restriction
+    genres = SetSelectMultipleField(
         'genres', validators=[DataRequired()],
         coerce=str,
-        choices=Genre.choices()
+        choices=Genre.choices(), values=GENRE_SET
     )
     facebook_link = StringField(
         'facebook_link', 
@@ -86,9 +107,9 @@ class ArtistForm(Form):
     city = StringField(
         'city', validators=[DataRequired()]
     )
-    state = SelectField(
+    state = SetSelectField(
         'state', validators=[DataRequired()],
-        choices=State.choices()
+        choices=State.choices(), values=STATE_SET
     )
     phone = StringField(
         'phone',
@@ -99,10 +120,10 @@ class ArtistForm(Form):
         'image_link',
         validators=[Optional(), URL(), validate_link],
     )
-    genres = SelectMultipleField(
+    genres = SetSelectMultipleField(
         'genres', validators=[DataRequired()],
         coerce=str,
-        choices=Genre.choices()
+        choices=Genre.choices(), values=GENRE_SET
      )
     facebook_link = StringField(
         # TODO implement enum restriction
@@ -117,4 +138,31 @@ class ArtistForm(Form):
 
     seeking_description = StringField(
             'seeking_description'
-     )
\ No newline at end of file
+     )
+
+_prototypes = {}
+
+def build_form(form_class, formdata, csrf=False):
+    # form_class bound to formdata, for the create/edit views and the
+    # importer. Constructing a form binds every field and re-runs its label,
+    # flag and validator setup; instead the fields of one cached, unbound
+    # instance are shallow-copied and only process() runs per call. Fields
+    # are copied through object.__new__ because Field.__new__ returns an
+    # UnboundField when called without a form. Views pass csrf=True so the
+    # form keeps the csrf_token field (checked and rendered per
+    # WTF_CSRF_ENABLED, like a constructed form) when a failed submission is
+    # re-rendered.
+    enabled = bool(csrf) and current_app.config.get('WTF_CSRF_ENABLED', True)
+    prototype = _prototypes.get((form_class, enabled))
+    if prototype is None:
+        prototype = _prototypes[form_class, enabled] = form_class(formdata=None, meta={'csrf': enabled})
+
+    form = object.__new__(form_class)
+    form.__dict__.update(prototype.__dict__)
+    form._fields = prototype._fields.copy()
+    for name, field in form._fields.items():
+        copied = object.__new__(type(field))
+        copied.__dict__.update(field.__dict__)
+        form._fields[name] = form.__dict__[name] = copied
+    form.process(formdata)
+    return form
@@ -0,0 +1,146 @@
+# Genre filters.
+#----------------------------------------------------------------------------#
+# /venues?genre=Jazz,Blues lists venues with any of the genres (&&), and
+# &match=all only those with every one of them. With GENRE_STORAGE 'mask'
+# (the default) the filter is a bitwise AND on the genre_mask integers; with
+# 'array' it runs on the genres ARRAY columns and their GIN indexes (&& and
+# @>, PostgreSQL only); with 'table' it runs on the normalized genre /
+# venue_genre / artist_genre tables. The arrays stay the source of truth: they
+# keep the genres in the order they were entered for the pages, forms and
+# API, and genre_mask is set from them on every ORM write (bulk loads compute
+# it with enums.genre_mask). Bulk query.update() statements bypass that, so
+# 'flask genres check [--fix]' compares every mask with its array. In 'table'
+# mode ORM writes update the links as they flush, and bulk loads (or switching
+# modes) call rebuild_links(), also available as 'flask genres rebuild'.
+from flask import abort, current_app, has_app_context, request
+from sqlalchemy import bindparam, event, inspect
+from sqlalchemy.dialects import postgresql
+from extensions import db
+from models import Venue, Artist, genre, venue_genre, artist_genre
+from enums import GENRE_VALUES, GENRE_SET, genre_mask
+
+GENRE_NAMES = GENRE_VALUES
+
+# model -> (link table, its entity id column)
+LINKS = {
+    Venue: (venue_genre, venue_genre.c.venue_id),
+    Artist: (artist_genre, artist_genre.c.artist_id)
+}
+
+def storage():
+    return current_app.config.get('GENRE_STORAGE', 'mask') if has_app_context() else 'mask'
+
+def table_storage():
+    return storage() == 'table'
+
+def requested_genres():
+    # (genres, match) from ?genre=Jazz,Blues&match=any|all; 400 on unknown values
+    value = request.args.get('genre', '')
+    genres = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in genres if name not in GENRE_SET]
+    match = request.args.get('match', 'any')
+    if unknown or match not in ('any', 'all'):
+        abort(400)
+    return genres, match
+
+def genre_filter(model, genres, match='any'):
+    # WHERE clause for the venues or artists tagged with any/all of genres
+    if storage() == 'mask':
+        mask = genre_mask(genres)
+        matched = model.genre_mask.op('&')(mask)
+        return matched == mask if match == 'all' else matched != 0
+
+    if not table_storage():
+        # the columns are the generic ARRAY type, which has no @>/&& methods
+        values = db.cast(postgresql.array(genres), postgresql.ARRAY(db.String))
+        return model.genres.op('@>' if match == 'all' else '&&')(values)
+
+    link, entity_id = LINKS[model]
+    matching = db.select([entity_id])\
+        .select_from(link.join(genre, genre.c.id == link.c.genre_id))\
+        .where(genre.c.name.in_(genres))
+    if match == 'all':
+        matching = matching.group_by(entity_id)\
+            .having(db.func.count() == len(set(genres)))
+    return model.id.in_(matching)
+
+def filter_by_genre(query, model):
+    genres, match = requested_genres()
+    if not genres:
+        return query, []
+    return query.filter(genre_filter(model, genres, match)), genres
+
+def genre_ids(connection):
+    # {name: id}, adding any Genre missing from the lookup table
+    ids = dict(connection.execute(db.select([genre.c.name, genre.c.id])).fetchall())
+    missing = [name for name in GENRE_NAMES if name not in ids]
+    if missing:
+        connection.execute(genre.insert(), [{"name": name} for name in missing])
+        ids = dict(connection.execute(db.select([genre.c.name, genre.c.id])).fetchall())
+    return ids
+
+def _write_links(connection, model, rows):
+    # rows: [(entity id, genres)]; replaces those entities' links
+    link, entity_id = LINKS[model]
+    rows = list(rows)
+    if not rows:
+        return
+    ids = genre_ids(connection)
+    connection.execute(link.delete().where(entity_id.in_([row[0] for row in rows])))
+    links = [{"genre_id": ids[name], entity_id.key: row_id}
+             for row_id, names in rows for name in set(names or []) if name in ids]
+    if links:
+        connection.execute(link.insert(), links)
+
+def _links_inserted(mapper, connection, target):
+    if table_storage():
+        _write_links(connection, type(target), [(target.id, target.genres)])
+
+def _links_updated(mapper, connection, target):
+    if table_storage() and inspect(target).attrs.genres.history.has_changes():
+        _write_links(connection, type(target), [(target.id, target.genres)])
+
+def _set_mask(mapper, connection, target):
+    target.genre_mask = genre_mask(target.genres)
+
+for model in (Venue, Artist):
+    event.listen(model, 'before_insert', _set_mask)
+    event.listen(model, 'before_update', _set_mask)
+    event.listen(model, 'after_insert', _links_inserted)
+    event.listen(model, 'after_update', _links_updated)
+
+def rebuild_links(model, min_id=None, batch_size=5000):
+    # Rewrites the links of every venue or artist (with id >= min_id) from
+    # its genres array, batch_size rows per statement.
+    query = db.session.query(model.id, model.genres).order_by(model.id)
+    if min_id is not None:
+        query = query.filter(model.id >= min_id)
+    connection = db.session.connection()
+
+    batch = []
+    for row in query.yield_per(batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            _write_links(connection, model, batch)
+            batch = []
+    _write_links(connection, model, batch)
+
+def mask_mismatches(model, batch_size=5000):
+    # [(id, stored genre_mask, mask of its genres)] for every venue or artist
+    # whose mask disagrees with its genres array
+    query = db.session.query(model.id, model.genres, model.genre_mask).order_by(model.id)
+    mismatches = []
+    for entity_id, names, stored in query.yield_per(batch_size):
+        expected = genre_mask(names)
+        if stored != expected:
+            mismatches.append((entity_id, stored, expected))
+    return mismatches
+
+def fix_masks(model, mismatches):
+    table = model.__table__
+    db.session.execute(
+        table.update()
+            .where(table.c.id == bindparam('_id'))
+            .values(genre_mask=bindparam('_mask')),
+        [{"_id": entity_id, "_mask": expected} for entity_id, _, expected in mismatches]
+    )
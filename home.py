@@ -0,0 +1,56 @@
+# Home page widgets.
+#----------------------------------------------------------------------------#
+# The recently listed venues/artists and this week's shows are rendered into
+# one fragment cache entry, so a home page hit costs a cache lookup instead of
+# three queries. Writes call invalidate_widgets(); otherwise the fragment is
+# re-rendered every HOME_WIDGETS_TTL seconds, which also moves the week window.
+from datetime import datetime, timedelta
+from flask import current_app, render_template
+from extensions import db, fragment_cache
+from models import Venue, Artist, Show
+
+# the widgets are a single fragment: home:0
+WIDGETS_ID = 0
+
+def render_widgets():
+    size = current_app.config.get('HOME_WIDGET_SIZE', 10)
+    now = datetime.now()
+
+    venues = db.session.query(Venue.id, Venue.name, Venue.city, Venue.state)\
+        .order_by(Venue.id.desc())\
+        .limit(size)\
+        .all()
+    artists = db.session.query(Artist.id, Artist.name, Artist.city, Artist.state)\
+        .order_by(Artist.id.desc())\
+        .limit(size)\
+        .all()
+    shows = db.session.query(
+            Show.start_time,
+            Venue.id.label('venue_id'),
+            Venue.name.label('venue_name'),
+            Artist.id.label('artist_id'),
+            Artist.name.label('artist_name')
+        )\
+        .join(Venue, Show.venue_id == Venue.id)\
+        .join(Artist, Show.artist_id == Artist.id)\
+        .filter(Show.start_time >= now)\
+        .filter(Show.start_time < now + timedelta(days=7))\
+        .order_by(Show.start_time, Show.id)\
+        .limit(size)\
+        .all()
+
+    return render_template('pages/home_widgets.html', venues=venues, artists=artists, shows=shows)
+
+def widgets_html():
+    # None if the widgets cannot be rendered; the home page still renders
+    try:
+        return fragment_cache.get_or_render(
+            'home', WIDGETS_ID, render_widgets, ttl=current_app.config.get('HOME_WIDGETS_TTL', 60)
+        )
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception('Home page widgets could not be rendered')
+        return None
+
+def invalidate_widgets():
+    fragment_cache.bump('home', WIDGETS_ID)
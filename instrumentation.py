@@ -0,0 +1,160 @@
+# Instrumentation.
+#----------------------------------------------------------------------------#
+# Opt-in (INSTRUMENTATION_ENABLED) per-request SQL statement counts, DB time,
+# template render time and repeated-statement (N+1) detection. Each response
+# gets a Server-Timing header, and totals per endpoint are served from
+# /_metrics in the Prometheus text format. Streamed responses (/shows?stream=1,
+# the /api/v1 listings) run most of their SQL after the headers are sent: their
+# Server-Timing only covers the work done before the first chunk, and their
+# totals are recorded in /_metrics once the server closes the response.
+import threading
+import time
+from collections import Counter, defaultdict
+from flask import Response, current_app, g, has_request_context, request
+from flask import before_render_template, template_rendered
+from sqlalchemy import event
+from extensions import db, fragment_cache
+
+METRICS = (
+    ('requests_total', 'counter', 'Requests handled.'),
+    ('sql_statements_total', 'counter', 'SQL statements executed while handling requests.'),
+    ('db_seconds_total', 'counter', 'Time spent executing SQL statements.'),
+    ('template_seconds_total', 'counter', 'Time spent rendering templates.'),
+    ('request_seconds_total', 'counter', 'Time spent handling requests.'),
+    ('n_plus_one_total', 'counter', 'Requests that repeated a SQL statement N_PLUS_ONE_THRESHOLD times or more.'),
+)
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.statements = Counter()
+        self._template_starts = []
+
+    def repeated_statements(self, threshold):
+        return [(statement, count) for statement, count in self.statements.items() if count >= threshold]
+
+def _current_stats():
+    if has_request_context():
+        return g.get('_instrumentation')
+    return None
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_query_started', []).append(time.perf_counter())
+
+def _statement_finished(conn, statement):
+    elapsed = time.perf_counter() - conn.info['_query_started'].pop()
+    stats = _current_stats()
+    if stats is not None:
+        stats.sql_count += 1
+        stats.db_time += elapsed
+        stats.statements[statement] += 1
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _statement_finished(conn, statement)
+
+def _handle_error(context):
+    # a failed statement never reaches after_cursor_execute; pop its start
+    # time here, or every later statement on the connection is mistimed
+    conn = context.connection
+    if conn is not None and conn.info.get('_query_started'):
+        _statement_finished(conn, context.statement)
+
+ENGINE_EVENTS = (
+    ('before_cursor_execute', _before_cursor_execute),
+    ('after_cursor_execute', _after_cursor_execute),
+    ('handle_error', _handle_error),
+)
+
+def _before_render_template(sender, template, context, **extra):
+    stats = _current_stats()
+    if stats is not None:
+        stats._template_starts.append(time.perf_counter())
+
+def _template_rendered(sender, template, context, **extra):
+    stats = _current_stats()
+    if stats is not None and stats._template_starts:
+        stats.template_time += time.perf_counter() - stats._template_starts.pop()
+
+class Instrumentation:
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self.totals = defaultdict(lambda: defaultdict(float))
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('INSTRUMENTATION_ENABLED'):
+            return
+
+        with app.app_context():
+            engine = db.get_engine(app)
+        for name, listener in ENGINE_EVENTS:
+            event.listen(engine, name, listener)
+        before_render_template.connect(_before_render_template, app)
+        template_rendered.connect(_template_rendered, app)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule('/_metrics', 'metrics', self.metrics_view)
+
+    def _before_request(self):
+        g._instrumentation = RequestStats()
+
+    def _after_request(self, response):
+        stats = g.get('_instrumentation')
+        if stats is None:
+            return response
+
+        response.headers.add('Server-Timing', ', '.join([
+            f'db;dur={stats.db_time * 1000:.2f};desc="{stats.sql_count} queries"',
+            f'tpl;dur={stats.template_time * 1000:.2f}',
+            f'total;dur={(time.perf_counter() - stats.started) * 1000:.2f}',
+        ]))
+
+        endpoint = request.endpoint or 'unknown'
+        threshold = current_app.config.get('N_PLUS_ONE_THRESHOLD', 3)
+        logger = current_app.logger
+        if response.is_streamed:
+            # stats stays in g, so the statements run by the streamed body
+            # are still counted; record it once the body has been sent
+            response.call_on_close(lambda: self._record(endpoint, stats, threshold, logger))
+        else:
+            g.pop('_instrumentation')
+            self._record(endpoint, stats, threshold, logger)
+        return response
+
+    def _record(self, endpoint, stats, threshold, logger):
+        total_time = time.perf_counter() - stats.started
+        repeated = stats.repeated_statements(threshold)
+        for statement, count in repeated:
+            logger.warning('Possible N+1 on %s: statement ran %d times: %s', endpoint, count, statement)
+
+        with self._lock:
+            totals = self.totals[endpoint]
+            totals['requests_total'] += 1
+            totals['sql_statements_total'] += stats.sql_count
+            totals['db_seconds_total'] += stats.db_time
+            totals['template_seconds_total'] += stats.template_time
+            totals['request_seconds_total'] += total_time
+            totals['n_plus_one_total'] += 1 if repeated else 0
+
+    def metrics_view(self):
+        lines = []
+        with self._lock:
+            for name, kind, description in METRICS:
+                lines.append(f'# HELP fyyur_{name} {description}')
+                lines.append(f'# TYPE fyyur_{name} {kind}')
+                for endpoint, totals in sorted(self.totals.items()):
+                    lines.append(f'fyyur_{name}{{endpoint="{endpoint}"}} {totals[name]:g}')
+
+        cache_stats = fragment_cache.stats()
+        for name in ('hits', 'misses'):
+            lines.append(f'# TYPE fyyur_fragment_cache_{name}_total counter')
+            lines.append(f'fyyur_fragment_cache_{name}_total {cache_stats[name]}')
+
+        return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+instrumentation = Instrumentation()
@@ -0,0 +1,62 @@
+"""genre lookup tables
+
+Revision ID: 0a9d5e7c3b14
+Revises: f4b81d3a6c57
+Create Date: 2026-10-18 17:35:12.660481
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a9d5e7c3b14'
+down_revision = 'f4b81d3a6c57'
+branch_labels = None
+depends_on = None
+
+GENRES = ('Alternative', 'Blues', 'Classical', 'Country', 'Electronic', 'Folk', 'Funk', 'Hip-Hop',
+          'Heavy Metal', 'Instrumental', 'Jazz', 'Musical Theatre', 'Pop', 'Punk', 'R&B', 'Reggae',
+          'Rock n Roll', 'Soul', 'Other')
+
+
+def upgrade():
+    genre = op.create_table('genre',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_table('venue_genre',
+    sa.Column('genre_id', sa.Integer(), nullable=False),
+    sa.Column('venue_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['genre_id'], ['genre.id'], ),
+    sa.ForeignKeyConstraint(['venue_id'], ['Venue.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('genre_id', 'venue_id')
+    )
+    op.create_index(op.f('ix_venue_genre_venue_id'), 'venue_genre', ['venue_id'], unique=False)
+    op.create_table('artist_genre',
+    sa.Column('genre_id', sa.Integer(), nullable=False),
+    sa.Column('artist_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['artist_id'], ['Artist.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['genre_id'], ['genre.id'], ),
+    sa.PrimaryKeyConstraint('genre_id', 'artist_id')
+    )
+    op.create_index(op.f('ix_artist_genre_artist_id'), 'artist_genre', ['artist_id'], unique=False)
+
+    op.bulk_insert(genre, [{"name": name} for name in GENRES])
+    # links for the existing rows, from their genres arrays
+    for table, link, column in (('Venue', 'venue_genre', 'venue_id'), ('Artist', 'artist_genre', 'artist_id')):
+        op.execute(f'''
+            INSERT INTO {link} (genre_id, {column})
+            SELECT DISTINCT genre.id, "{table}".id
+            FROM "{table}" JOIN genre ON genre.name = ANY("{table}".genres)
+        ''')
+
+
+def downgrade():
+    op.drop_index(op.f('ix_artist_genre_artist_id'), table_name='artist_genre')
+    op.drop_table('artist_genre')
+    op.drop_index(op.f('ix_venue_genre_venue_id'), table_name='venue_genre')
+    op.drop_table('venue_genre')
+    op.drop_table('genre')
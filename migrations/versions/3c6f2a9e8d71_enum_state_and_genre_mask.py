@@ -0,0 +1,58 @@
+"""enum state and genre mask
+
+Revision ID: 3c6f2a9e8d71
+Revises: 0a9d5e7c3b14
+Create Date: 2026-10-18 18:22:47.105839
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '3c6f2a9e8d71'
+down_revision = '0a9d5e7c3b14'
+branch_labels = None
+depends_on = None
+
+STATES = ('AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'DC', 'FL', 'GA', 'HI', 'ID', 'IL', 'IN', 'IA',
+          'KS', 'KY', 'LA', 'ME', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR',
+          'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'PA', 'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA',
+          'WV', 'WI', 'WY')
+
+# enums.GENRE_BITS at the time of this migration
+GENRES = ('Alternative', 'Blues', 'Classical', 'Country', 'Electronic', 'Folk', 'Funk', 'Hip-Hop',
+          'Heavy Metal', 'Instrumental', 'Jazz', 'Musical Theatre', 'Pop', 'Punk', 'R&B', 'Reggae',
+          'Rock n Roll', 'Soul', 'Other')
+
+us_state = postgresql.ENUM(*STATES, name='us_state')
+
+
+def upgrade():
+    us_state.create(op.get_bind())
+    bits = ', '.join(f"('{name}', {1 << index})" for index, name in enumerate(GENRES))
+
+    for table in ('Venue', 'Artist'):
+        # trigram indexes do not apply to enums; search matches states with IN
+        op.drop_index(f'ix_{table}_state_trgm', table_name=table)
+        # fails on a state outside enums.State; find those with
+        # SELECT id, state FROM "<table>" WHERE upper(trim(state)) <> ALL(enum_range(NULL::us_state)::text[]);
+        op.execute(f'ALTER TABLE "{table}" ALTER COLUMN state TYPE us_state USING upper(trim(state))::us_state')
+
+        op.add_column(table, sa.Column('genre_mask', sa.Integer(), nullable=False, server_default='0'))
+        op.execute(f'''
+            UPDATE "{table}" SET genre_mask = coalesce((
+                SELECT bit_or(bits.bit) FROM (VALUES {bits}) AS bits(name, bit)
+                WHERE bits.name = ANY("{table}".genres)
+            ), 0)
+        ''')
+
+
+def downgrade():
+    for table in ('Artist', 'Venue'):
+        op.drop_column(table, 'genre_mask')
+        op.execute(f'ALTER TABLE "{table}" ALTER COLUMN state TYPE VARCHAR(120) USING state::text')
+        op.create_index(f'ix_{table}_state_trgm', table, ['state'], unique=False,
+                        postgresql_using='gin', postgresql_ops={'state': 'gin_trgm_ops'})
+    us_state.drop(op.get_bind())
@@ -0,0 +1,42 @@
+"""indexes for hot predicates
+
+Revision ID: 5d8e2b7c41a0
+Revises: 1c0f6a3e9b52
+Create Date: 2026-10-18 09:40:05.118734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d8e2b7c41a0'
+down_revision = '1c0f6a3e9b52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # per-venue / per-artist show lookups and upcoming-show counts
+    op.create_index('ix_Show_venue_id_start_time', 'Show', ['venue_id', 'start_time'], unique=False)
+    op.create_index('ix_Show_artist_id_start_time', 'Show', ['artist_id', 'start_time'], unique=False)
+    # keyset pagination on /shows, /artists and /venues
+    op.create_index('ix_Show_start_time_id', 'Show', ['start_time', 'id'], unique=False)
+    op.create_index('ix_Artist_name_id', 'Artist', ['name', 'id'], unique=False)
+    op.create_index('ix_Venue_name_id', 'Venue', ['name', 'id'], unique=False)
+    # /venues area grouping
+    op.create_index('ix_Venue_city_state', 'Venue', ['city', 'state'], unique=False)
+    # genre containment (@>, &&) on the ARRAY columns
+    op.create_index('ix_Venue_genres', 'Venue', ['genres'], unique=False, postgresql_using='gin')
+    op.create_index('ix_Artist_genres', 'Artist', ['genres'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_Artist_genres', table_name='Artist')
+    op.drop_index('ix_Venue_genres', table_name='Venue')
+    op.drop_index('ix_Venue_city_state', table_name='Venue')
+    op.drop_index('ix_Venue_name_id', table_name='Venue')
+    op.drop_index('ix_Artist_name_id', table_name='Artist')
+    op.drop_index('ix_Show_start_time_id', table_name='Show')
+    op.drop_index('ix_Show_artist_id_start_time', table_name='Show')
+    op.drop_index('ix_Show_venue_id_start_time', table_name='Show')
@@ -0,0 +1,29 @@
+"""name not null
+
+Revision ID: 7b2e4d9f1a36
+Revises: 3c6f2a9e8d71
+Create Date: 2026-10-18 20:04:31.518227
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b2e4d9f1a36'
+down_revision = '3c6f2a9e8d71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keyset pages seek on (name, id) > (:name, :id), which never matches a
+    # NULL name; unnamed rows sort first as ''.
+    for table in ('Venue', 'Artist'):
+        op.execute(f'''UPDATE "{table}" SET name = '' WHERE name IS NULL''')
+        op.alter_column(table, 'name', existing_type=sa.String(), nullable=False)
+
+
+def downgrade():
+    for table in ('Artist', 'Venue'):
+        op.alter_column(table, 'name', existing_type=sa.String(), nullable=True)
@@ -0,0 +1,32 @@
+"""trigram search indexes
+
+Revision ID: 8a41f0d2c6e7
+Revises: 5d8e2b7c41a0
+Create Date: 2026-10-18 10:21:37.904412
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a41f0d2c6e7'
+down_revision = '5d8e2b7c41a0'
+branch_labels = None
+depends_on = None
+
+SEARCH_FIELDS = ('name', 'city', 'state')
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table in ('Venue', 'Artist'):
+        for field in SEARCH_FIELDS:
+            op.create_index(f'ix_{table}_{field}_trgm', table, [field], unique=False,
+                            postgresql_using='gin', postgresql_ops={field: 'gin_trgm_ops'})
+
+
+def downgrade():
+    for table in ('Artist', 'Venue'):
+        for field in reversed(SEARCH_FIELDS):
+            op.drop_index(f'ix_{table}_{field}_trgm', table_name=table)
@@ -0,0 +1,50 @@
+"""show counters
+
+Revision ID: d61c4a8e2f93
+Revises: b3e97c1d5f24
+Create Date: 2026-10-18 14:37:52.904115
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd61c4a8e2f93'
+down_revision = 'b3e97c1d5f24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('Venue', 'Artist'):
+        op.add_column(table, sa.Column('upcoming_shows_count', sa.Integer(), nullable=False, server_default='0'))
+        op.add_column(table, sa.Column('past_shows_count', sa.Integer(), nullable=False, server_default='0'))
+
+    op.create_table('ShowRollover',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('rolled_over_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute('INSERT INTO "ShowRollover" (rolled_over_at) VALUES (localtimestamp)')
+
+    # backfill relative to the watermark just written
+    for table, fk_column in (('Venue', 'venue_id'), ('Artist', 'artist_id')):
+        op.execute(f'''
+            UPDATE "{table}" SET
+                upcoming_shows_count = (
+                    SELECT count(*) FROM "Show"
+                    WHERE "Show".{fk_column} = "{table}".id
+                      AND "Show".start_time > (SELECT rolled_over_at FROM "ShowRollover" LIMIT 1)),
+                past_shows_count = (
+                    SELECT count(*) FROM "Show"
+                    WHERE "Show".{fk_column} = "{table}".id
+                      AND "Show".start_time <= (SELECT rolled_over_at FROM "ShowRollover" LIMIT 1))
+        ''')
+
+
+def downgrade():
+    op.drop_table('ShowRollover')
+    for table in ('Artist', 'Venue'):
+        op.drop_column(table, 'past_shows_count')
+        op.drop_column(table, 'upcoming_shows_count')
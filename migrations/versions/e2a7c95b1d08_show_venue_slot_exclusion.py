@@ -0,0 +1,34 @@
+"""show venue slot exclusion
+
+Revision ID: e2a7c95b1d08
+Revises: d61c4a8e2f93
+Create Date: 2026-10-18 15:21:09.517302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a7c95b1d08'
+down_revision = 'd61c4a8e2f93'
+branch_labels = None
+depends_on = None
+
+# must match bookings.SHOW_SLOT_MINUTES
+SLOT = "interval '180 minutes'"
+
+
+def upgrade():
+    # Fails if the table already holds overlapping shows; find them with
+    # SELECT a.id, b.id FROM "Show" a JOIN "Show" b ON a.venue_id = b.venue_id
+    #   AND a.id < b.id AND abs(extract(epoch FROM a.start_time - b.start_time)) < 180 * 60;
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.execute(f'''
+        ALTER TABLE "Show" ADD CONSTRAINT "ex_Show_venue_slot"
+        EXCLUDE USING gist (venue_id WITH =, tsrange(start_time, start_time + {SLOT}) WITH &&)
+    ''')
+
+
+def downgrade():
+    op.execute('ALTER TABLE "Show" DROP CONSTRAINT "ex_Show_venue_slot"')
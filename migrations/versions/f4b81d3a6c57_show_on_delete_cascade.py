@@ -0,0 +1,28 @@
+"""show on delete cascade
+
+Revision ID: f4b81d3a6c57
+Revises: e2a7c95b1d08
+Create Date: 2026-10-18 16:48:30.271946
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4b81d3a6c57'
+down_revision = 'e2a7c95b1d08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for column, parent in (('artist_id', 'Artist'), ('venue_id', 'Venue')):
+        op.drop_constraint(f'Show_{column}_fkey', 'Show', type_='foreignkey')
+        op.create_foreign_key(f'Show_{column}_fkey', 'Show', parent, [column], ['id'], ondelete='CASCADE')
+
+
+def downgrade():
+    for column, parent in (('artist_id', 'Artist'), ('venue_id', 'Venue')):
+        op.drop_constraint(f'Show_{column}_fkey', 'Show', type_='foreignkey')
+        op.create_foreign_key(f'Show_{column}_fkey', 'Show', parent, [column], ['id'])
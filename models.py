@@ -1,37 +1,67 @@
 # Models. 
 #----------------------------------------------------------------------------#
+from datetime import datetime
 from extensions import db
+from enums import STATE_VALUES
 
 class Venue(db.Model):
     __tablename__ = 'Venue'
+    __table_args__ = (
+        db.Index('ix_Venue_city_state', 'city', 'state'),
+        db.Index('ix_Venue_name_id', 'name', 'id'),
+        db.Index('ix_Venue_genres', 'genres', postgresql_using='gin'),
+        db.Index('ix_Venue_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        db.Index('ix_Venue_city_trgm', 'city', postgresql_using='gin', postgresql_ops={'city': 'gin_trgm_ops'}),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String)
+    name = db.Column(db.String, nullable=False)
     city = db.Column(db.String(120))
-    state = db.Column(db.String(120))
+    state = db.Column(db.Enum(*STATE_VALUES, name='us_state'))
     address = db.Column(db.String(120))
     phone = db.Column(db.String(120))
     image_link = db.Column(db.String(500))
     facebook_link = db.Column(db.String(120))
     
     # TODO: implement any missing fields, as a database migration using Flask-Migrate
-    genres = db.Column(db.ARRAY(db.String))
+    # ARRAY on PostgreSQL; a JSON list on SQLite so the testing config works
+    genres = db.Column(db.ARRAY(db.String).with_variant(db.JSON, 'sqlite'))
+    # bitwise OR of enums.GENRE_BITS of genres, kept in step by genres.py
+    genre_mask = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     website_link = db.Column(db.String(120))
     seeking_talent = db.Column(db.Boolean)
     seeking_description = db.Column(db.String(120))
+    upcoming_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    past_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime, nullable=False, index=True,
+                           default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Never loaded: pages select the show columns they need (queries.py), and
+    # touching the collection raises instead of running a SELECT per row.
+    # Deleting the parent removes them through ON DELETE CASCADE, not the ORM.
+    shows = db.relationship('Show', back_populates='venue', order_by='Show.start_time',
+                            lazy='raise_on_sql', passive_deletes=True)
     
     def __repr__(self):
         return f'<Venue {self.id} {self.name} {self.city}, {self.state}>'
 
 class Artist(db.Model):
     __tablename__ = 'Artist'
+    __table_args__ = (
+        db.Index('ix_Artist_name_id', 'name', 'id'),
+        db.Index('ix_Artist_genres', 'genres', postgresql_using='gin'),
+        db.Index('ix_Artist_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        db.Index('ix_Artist_city_trgm', 'city', postgresql_using='gin', postgresql_ops={'city': 'gin_trgm_ops'}),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String)
+    name = db.Column(db.String, nullable=False)
     city = db.Column(db.String(120))
-    state = db.Column(db.String(120))
+    state = db.Column(db.Enum(*STATE_VALUES, name='us_state'))
     phone = db.Column(db.String(120))
-    genres = db.Column(db.ARRAY(db.String))
+    genres = db.Column(db.ARRAY(db.String).with_variant(db.JSON, 'sqlite'))
+    # bitwise OR of enums.GENRE_BITS of genres, kept in step by genres.py
+    genre_mask = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     image_link = db.Column(db.String(500))
     facebook_link = db.Column(db.String(120))
 
@@ -39,17 +69,62 @@ class Artist(db.Model):
     website_link = db.Column(db.String(120))
     seeking_venues = db.Column(db.Boolean)
     seeking_description = db.Column(db.String(120))
+    upcoming_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    past_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime, nullable=False, index=True,
+                           default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Never loaded: pages select the show columns they need (queries.py), and
+    # touching the collection raises instead of running a SELECT per row.
+    # Deleting the parent removes them through ON DELETE CASCADE, not the ORM.
+    shows = db.relationship('Show', back_populates='artist', order_by='Show.start_time',
+                            lazy='raise_on_sql', passive_deletes=True)
     
 class Show(db.Model):
     __tablename__ = 'Show'
+    __table_args__ = (
+        db.Index('ix_Show_venue_id_start_time', 'venue_id', 'start_time'),
+        db.Index('ix_Show_artist_id_start_time', 'artist_id', 'start_time'),
+        db.Index('ix_Show_start_time_id', 'start_time', 'id'),
+        # PostgreSQL also has the ex_Show_venue_slot exclusion constraint
+        # (migration e2a7c95b1d08); bookings.py checks the same rule.
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    artist_id = db.Column(db.Integer, db.ForeignKey('Artist.id'), nullable=False)
-    venue_id = db.Column(db.Integer, db.ForeignKey('Venue.id'), nullable=False)
+    artist_id = db.Column(db.Integer, db.ForeignKey('Artist.id', ondelete='CASCADE'), nullable=False)
+    venue_id = db.Column(db.Integer, db.ForeignKey('Venue.id', ondelete='CASCADE'), nullable=False)
     start_time = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, index=True,
+                           default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    artist = db.relationship('Artist', backref=db.backref('shows', lazy=True))
-    venue = db.relationship('Venue', backref=db.backref('shows', lazy=True))
+    # Never loaded: pages join Venue/Artist columns into their show queries.
+    artist = db.relationship('Artist', back_populates='shows', lazy='raise_on_sql')
+    venue = db.relationship('Venue', back_populates='shows', lazy='raise_on_sql')
 
     def __repr__(self):
-        return f'<Show {self.venue_id} {self.artist_id} {self.start_time}>'
\ No newline at end of file
+        return f'<Show {self.venue_id} {self.artist_id} {self.start_time}>'
+
+class ShowRollover(db.Model):
+    # Single row: shows starting after rolled_over_at are counted as upcoming
+    # in Venue/Artist.upcoming_shows_count, the rest as past.
+    __tablename__ = 'ShowRollover'
+
+    id = db.Column(db.Integer, primary_key=True)
+    rolled_over_at = db.Column(db.DateTime, nullable=False)
+
+# Normalized genres, read instead of the genres arrays when GENRE_STORAGE is
+# 'table' (see genres.py, which keeps the links in step with the arrays).
+genre = db.Table('genre',
+    db.Column('id', db.Integer, primary_key=True),
+    db.Column('name', db.String(50), nullable=False, unique=True)
+)
+
+venue_genre = db.Table('venue_genre',
+    db.Column('genre_id', db.Integer, db.ForeignKey('genre.id'), primary_key=True),
+    db.Column('venue_id', db.Integer, db.ForeignKey('Venue.id', ondelete='CASCADE'), primary_key=True, index=True)
+)
+
+artist_genre = db.Table('artist_genre',
+    db.Column('genre_id', db.Integer, db.ForeignKey('genre.id'), primary_key=True),
+    db.Column('artist_id', db.Integer, db.ForeignKey('Artist.id', ondelete='CASCADE'), primary_key=True, index=True)
+)
@@ -0,0 +1,100 @@
+# Keyset pagination.
+#----------------------------------------------------------------------------#
+# Pages are sought with a WHERE (key) > (cursor) clause instead of OFFSET, so
+# every page costs the same index range scan no matter how deep it is.
+import base64
+import json
+from datetime import datetime
+from flask import current_app, request, url_for
+from extensions import db
+
+class KeysetPage:
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def links(self, endpoint, **values):
+        # next/prev urls for the templates and the JSON variants
+        args = dict(request.args)
+        args.pop('cursor', None)
+        args.update(values)
+        return {
+            "next": url_for(endpoint, cursor=self.next_cursor, **args) if self.has_next else None,
+            "prev": url_for(endpoint, cursor=self.prev_cursor, **args) if self.has_prev else None
+        }
+
+def encode_cursor(direction, values):
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps([direction, values], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, columns):
+    # Returns (direction, values) or None for a missing or malformed cursor.
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        direction, values = json.loads(raw.decode('utf-8'))
+        if direction not in ('next', 'prev') or len(values) != len(columns):
+            return None
+        return direction, [
+            datetime.fromisoformat(value) if column.type.python_type is datetime else value
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError, NotImplementedError):
+        return None
+
+def get_page_size():
+    default = current_app.config.get('PAGE_SIZE', 50)
+    maximum = current_app.config.get('MAX_PAGE_SIZE', 200)
+    page_size = request.args.get('limit', default, type=int)
+    return max(1, min(page_size, maximum))
+
+def keyset_paginate(query, columns, cursor=None, page_size=None):
+    # query must select every key column under its own name (column.key), and
+    # the key columns together must be unique, e.g. (Artist.name, Artist.id).
+    if page_size is None:
+        page_size = get_page_size()
+
+    key = db.tuple_(*columns)
+    decoded = decode_cursor(cursor, columns)
+    direction = decoded[0] if decoded else None
+
+    if direction == 'next':
+        query = query.filter(key > db.tuple_(*decoded[1])).order_by(*columns)
+    elif direction == 'prev':
+        query = query.filter(key < db.tuple_(*decoded[1]))\
+            .order_by(*[column.desc() for column in columns])
+    else:
+        query = query.order_by(*columns)
+
+    rows = query.limit(page_size + 1).all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == 'prev':
+        rows.reverse()
+
+    def cursor_for(row, row_direction):
+        return encode_cursor(row_direction, [getattr(row, column.key) for column in columns])
+
+    has_next = has_more if direction != 'prev' else True
+    has_prev = has_more if direction == 'prev' else direction == 'next'
+
+    return KeysetPage(
+        rows,
+        next_cursor=cursor_for(rows[-1], 'next') if rows and has_next else None,
+        prev_cursor=cursor_for(rows[0], 'prev') if rows and has_prev else None
+    )
+
+def wants_json():
+    return request.args.get('format') == 'json' or \
+        request.accept_mimetypes.best == 'application/json'
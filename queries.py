@@ -0,0 +1,36 @@
+# Shared queries.
+#----------------------------------------------------------------------------#
+from datetime import datetime
+from extensions import db
+from models import Show
+
+def show_counts(fk_column, boundary, ids=None):
+    # {parent id: (upcoming, past)} with upcoming meaning start_time > boundary,
+    # computed from the Show table in a single GROUP BY.
+    # fk_column is Show.venue_id or Show.artist_id.
+    upcoming = db.func.sum(db.case([(Show.start_time > boundary, 1)], else_=0))
+    past = db.func.sum(db.case([(Show.start_time <= boundary, 1)], else_=0))
+
+    query = db.session.query(fk_column, upcoming, past).group_by(fk_column)
+    if ids is not None:
+        query = query.filter(fk_column.in_(list(ids)))
+
+    return {parent_id: (int(upcoming or 0), int(past or 0)) for parent_id, upcoming, past in query}
+
+def split_shows(shows, now=None):
+    # Partition show rows ordered by start_time into (past, upcoming) at now.
+    if now is None:
+        now = datetime.now()
+
+    shows = list(shows)
+    boundary = next((i for i, show in enumerate(shows) if show.start_time >= now), len(shows))
+    return shows[:boundary], shows[boundary:]
+
+def counterpart_ids(fk_column, entity_id, counterpart_column):
+    # Distinct ids on the other side of an entity's shows, e.g. every artist
+    # that has played a venue: counterpart_ids(Show.venue_id, 1, Show.artist_id).
+    rows = db.session.query(counterpart_column)\
+        .filter(fk_column == entity_id)\
+        .distinct()\
+        .all()
+    return [row[0] for row in rows]
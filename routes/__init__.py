@@ -2,8 +2,14 @@ from flask import Blueprint
 from .artist import artist_routes
 from .venue import venue_routes
 from .show import show_routes
+from .search import search_routes
+from .api import api_routes
+from .autocomplete import autocomplete_routes
 
 def register_blueprints(app):
     app.register_blueprint(artist_routes)
     app.register_blueprint(venue_routes)
-    app.register_blueprint(show_routes)
\ No newline at end of file
+    app.register_blueprint(show_routes)
+    app.register_blueprint(search_routes)
+    app.register_blueprint(api_routes)
+    app.register_blueprint(autocomplete_routes)
\ No newline at end of file
@@ -0,0 +1,151 @@
+#  JSON API
+#  ----------------------------------------------------------------
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context, abort
+from models import Venue, Artist, Show
+from conditional import conditional_get
+from extensions import db
+from deletion import delete_entities
+
+api_routes = Blueprint('api', __name__, url_prefix='/api/v1')
+
+# public field name -> column; only the requested columns are selected
+RESOURCES = {
+    "venues": (Venue, {
+        "id": Venue.id,
+        "name": Venue.name,
+        "city": Venue.city,
+        "state": Venue.state,
+        "address": Venue.address,
+        "phone": Venue.phone,
+        "genres": Venue.genres,
+        "image_link": Venue.image_link,
+        "facebook_link": Venue.facebook_link,
+        "website_link": Venue.website_link,
+        "seeking_talent": Venue.seeking_talent,
+        "seeking_description": Venue.seeking_description,
+        "updated_at": Venue.updated_at
+    }),
+    "artists": (Artist, {
+        "id": Artist.id,
+        "name": Artist.name,
+        "city": Artist.city,
+        "state": Artist.state,
+        "phone": Artist.phone,
+        "genres": Artist.genres,
+        "image_link": Artist.image_link,
+        "facebook_link": Artist.facebook_link,
+        "website_link": Artist.website_link,
+        "seeking_venue": Artist.seeking_venues,
+        "seeking_description": Artist.seeking_description,
+        "updated_at": Artist.updated_at
+    }),
+    "shows": (Show, {
+        "id": Show.id,
+        "start_time": Show.start_time,
+        "venue_id": Show.venue_id,
+        "venue_name": Venue.name,
+        "artist_id": Show.artist_id,
+        "artist_name": Artist.name,
+        "artist_image_link": Artist.image_link,
+        "updated_at": Show.updated_at
+    })
+}
+
+def bad_request(message):
+    response = jsonify({"success": False, "error": 400, "message": message})
+    response.status_code = 400
+    abort(response)
+
+def selected_fields(columns):
+    # ?fields=id,name selects a sparse fieldset; all fields by default
+    fields = request.args.get('fields')
+    if not fields:
+        return list(columns)
+    fields = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in columns]
+    if unknown:
+        bad_request(f'Unknown fields: {", ".join(unknown)}')
+    return fields
+
+def projected_query(resource):
+    model, columns = RESOURCES[resource]
+    fields = selected_fields(columns)
+    query = db.session.query(*[columns[field].label(field) for field in fields])\
+        .select_from(model)
+
+    # shows only join the parent tables a requested field lives in
+    tables = {columns[field].class_ for field in fields}
+    if model is Show:
+        if Venue in tables:
+            query = query.join(Venue, Show.venue_id == Venue.id)
+        if Artist in tables:
+            query = query.join(Artist, Show.artist_id == Artist.id)
+    return model, fields, query
+
+def stream_json(fields, query):
+    # Rows come from a server-side cursor (yield_per) and are encoded one
+    # batch at a time, so an export never holds the whole result in memory.
+    batch_size = current_app.config.get('STREAM_BATCH_SIZE', 1000)
+    encoder = current_app.json_encoder(separators=(',', ':'))
+
+    def generate():
+        yield '{"data":['
+        chunk = []
+        first = True
+        for row in query.yield_per(batch_size):
+            chunk.append(encoder.encode(dict(zip(fields, row))))
+            if len(chunk) >= batch_size:
+                yield ('' if first else ',') + ','.join(chunk)
+                first = False
+                chunk = []
+        if chunk:
+            yield ('' if first else ',') + ','.join(chunk)
+        yield ']}'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+@api_routes.route('/venues')
+@conditional_get(Venue)
+def list_venues():
+    model, fields, query = projected_query('venues')
+    return stream_json(fields, query.order_by(Venue.id))
+
+@api_routes.route('/artists')
+@conditional_get(Artist)
+def list_artists():
+    model, fields, query = projected_query('artists')
+    return stream_json(fields, query.order_by(Artist.id))
+
+@api_routes.route('/shows')
+@conditional_get(Show, Venue, Artist)
+def list_shows():
+    model, fields, query = projected_query('shows')
+    return stream_json(fields, query.order_by(Show.start_time, Show.id))
+
+@api_routes.route('/<resource>/<int:entity_id>')
+@conditional_get(Venue, Artist, Show)
+def get_entity(resource, entity_id):
+    if resource not in RESOURCES:
+        abort(404)
+    model, fields, query = projected_query(resource)
+    row = query.filter(model.id == entity_id).first_or_404()
+    return jsonify({"data": dict(zip(fields, row))})
+
+@api_routes.route('/<resource>', methods=['DELETE'])
+def delete_entities_view(resource):
+    # DELETE /api/v1/venues {"ids": [1, 2, 3]}: all or nothing, in one
+    # transaction; shows go with them through ON DELETE CASCADE
+    if resource not in ('venues', 'artists'):
+        abort(404)
+    body = request.get_json(silent=True) or {}
+    ids = body.get('ids')
+    if not isinstance(ids, list) or not all(type(entity_id) is int for entity_id in ids):
+        bad_request('Expected a JSON body like {"ids": [1, 2, 3]}')
+
+    model = RESOURCES[resource][0]
+    deleted = delete_entities(model, ids)
+    return jsonify({
+        "success": True,
+        "deleted": sorted(deleted),
+        "not_found": sorted(set(ids) - set(deleted))
+    })
@@ -1,18 +1,36 @@
 #  Artists
 #  ----------------------------------------------------------------
-from flask import Blueprint, render_template, request, flash, redirect, url_for
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
 from models import Venue, Artist, Show
-from forms import ArtistForm
-from extensions import db, csrf
+from forms import ArtistForm, build_form
+from conditional import conditional_get
+from extensions import db, csrf, fragment_cache
+from queries import split_shows, counterpart_ids
+from pagination import keyset_paginate, wants_json
+from search import search_entities
+from genres import filter_by_genre
+from home import invalidate_widgets
+from deletion import delete_entities
 from datetime import datetime
 
 artist_routes = Blueprint('artist', __name__)
 
 @artist_routes.route('/artists')
+@conditional_get(Artist)
 def artists():
   # TODO: replace with real data returned from querying the database
-  data = Artist.query.all()
-  return render_template('pages/artists.html', artists=data)
+    artists_query, genres = filter_by_genre(db.session.query(Artist.id, Artist.name), Artist)
+    page = keyset_paginate(
+        artists_query,
+        (Artist.name, Artist.id),
+        cursor=request.args.get('cursor')
+    )
+    data = [{"id": artist.id, "name": artist.name} for artist in page.items]
+    links = page.links('artist.artists')
+
+    if wants_json():
+        return jsonify({"data": data, **links})
+    return render_template('pages/artists.html', artists=data, pagination=links, genres=genres)
 
 # Create
 @artist_routes.route('/artists/create', methods=['GET'])
@@ -26,7 +44,7 @@ def create_artist_submission():
   # TODO: insert form data as a new Venue record in the db, instead
   # TODO: modify data to be the data object returned from db insertion
     # Student's Work add create func
-    form = ArtistForm(request.form, meta={'csrf': False})
+    form = build_form(ArtistForm, request.form, csrf=True)
 
     if form.validate():
         try:
@@ -44,6 +62,7 @@ def create_artist_submission():
             )
             db.session.add(artist)
             db.session.commit()
+            invalidate_widgets()
             # on successful db insert, flash success
             flash('Artist ' + request.form['name'] + ' was successfully listed!')
             # TODO: on unsuccessful db insert, flash an error instead.
@@ -70,67 +89,61 @@ def search_artists():
   # search for "band" should return "The Wild Sax Band".
     search_term = request.form.get('search_term', '')
     
-    artists = Artist.query.filter(
-        db.or_(
-            Artist.name.ilike(f'%{search_term}%'),
-            Artist.city.ilike(f'%{search_term}%'),
-            Artist.state.ilike(f'%{search_term}%')
-        )
-    ).all()
+    count, artists = search_entities(Artist, search_term)
 
     response = {
-        "count": len(artists),
-        "data": []
+        "count": count,
+        "data": [{
+            "id": artist_id,
+            "name": name,
+            "num_upcoming_shows": num_upcoming_shows
+        } for artist_id, name, num_upcoming_shows in artists]
     }
 
-    current_time = datetime.now()
-    
-    for artist in artists:
-        upcoming_shows = db.session.query(Show).filter(
-            Show.artist_id == artist.id,
-            Show.start_time > current_time
-        ).count()
-
-        response["data"].append({
-            "id": artist.id,
-            "name": artist.name,
-            "num_upcoming_shows": upcoming_shows
-        })
-
     return render_template('pages/search_artists.html', 
                          results=response, 
                          search_term=search_term)
 
 @artist_routes.route('/artists/<int:artist_id>')
+@conditional_get(Artist, Venue, Show)
 def show_artist(artist_id):
   # shows the artist page with the given artist_id
   # TODO: replace with real artist data from the artist table, using artist_id
+    artist_html = fragment_cache.get_or_render(
+        'artist', artist_id, lambda: render_artist_detail(artist_id)
+    )
+    # the fragment rendered (or 404ed) above, so the name is there too
+    artist_name = fragment_cache.get_or_render(
+        'artist', artist_id, lambda: db.session.query(Artist.name).filter(Artist.id == artist_id).scalar(),
+        part='name', html=False
+    )
+    return render_template('pages/show_artist.html',
+                         artist_html=artist_html,
+                         artist_id=artist_id,
+                         artist_name=artist_name)
+
+def render_artist_detail(artist_id):
     artist = Artist.query.get_or_404(artist_id)
-    current_time = datetime.now()
-    
-    past_shows_query = db.session.query(Show).join(Venue).\
-        filter(Show.artist_id == artist_id).\
-        filter(Show.start_time < current_time)
-    past_shows = []
-    for show in past_shows_query:
-        past_shows.append({
-            "venue_id": show.venue.id,
-            "venue_name": show.venue.name,
-            "venue_image_link": show.venue.image_link,
-            "start_time": show.start_time.strftime('%Y-%m-%dT%H:%M:%S.000Z')
-        })
-    
-    upcoming_shows_query = db.session.query(Show).join(Venue).\
-        filter(Show.artist_id == artist_id).\
-        filter(Show.start_time > current_time)
-    upcoming_shows = []
-    for show in upcoming_shows_query:
-        upcoming_shows.append({
-            "venue_id": show.venue.id,
-            "venue_name": show.venue.name,
-            "venue_image_link": show.venue.image_link,
-            "start_time": show.start_time.strftime('%Y-%m-%dT%H:%M:%S.000Z')
-        })
+    shows_query = db.session.query(
+            Show.start_time,
+            Venue.id.label('venue_id'),
+            Venue.name.label('venue_name'),
+            Venue.image_link.label('venue_image_link')
+        )\
+        .join(Venue, Show.venue_id == Venue.id)\
+        .filter(Show.artist_id == artist_id)\
+        .order_by(Show.start_time)\
+        .all()
+
+    past_shows, upcoming_shows = [
+        [{
+            "venue_id": show.venue_id,
+            "venue_name": show.venue_name,
+            "venue_image_link": show.venue_image_link,
+            "start_time": show.start_time
+        } for show in shows]
+        for shows in split_shows(shows_query)
+    ]
     
     data = {
         "id": artist.id,
@@ -150,9 +163,35 @@ def show_artist(artist_id):
         "upcoming_shows_count": len(upcoming_shows)
     }
     
-    return render_template('pages/show_artist.html', artist=data)
+    return render_template('pages/artist_detail.html', artist=data)
 
 # Update
+@artist_routes.route('/artists/<int:artist_id>', methods=['DELETE'])
+def delete_artist(artist_id):
+    try:
+        # one DELETE; the artist's shows are removed by ON DELETE CASCADE
+        deleted = delete_entities(Artist, [artist_id])
+    except Exception as e:
+        print(e)
+        flash(f'An error occurred. Artist {artist_id} could not be deleted.')
+        return jsonify({
+            'success': False,
+            'redirect_url': f'/artists/{artist_id}'
+        })
+    finally:
+        db.session.close()
+
+    if artist_id not in deleted:
+        response = jsonify({'success': False, 'redirect_url': '/artists'})
+        response.status_code = 404
+        return response
+
+    return jsonify({
+        'success': True,
+        'message': f'Artist {deleted[artist_id]} was successfully deleted!',
+        'redirect_url': '/'
+    })
+
 @artist_routes.route('/artists/<int:artist_id>/edit', methods=['GET'])
 def edit_artist(artist_id):
     artist = Artist.query.get_or_404(artist_id)
@@ -181,9 +220,9 @@ def edit_artist(artist_id):
 def edit_artist_submission(artist_id):
     try:
         artist = Artist.query.get_or_404(artist_id)
-        form = ArtistForm()
+        form = build_form(ArtistForm, request.form, csrf=True)
 
-        if form.validate_on_submit():
+        if form.validate():
             artist.name = form.name.data
             artist.city = form.city.data
             artist.state = form.state.data
@@ -196,6 +235,9 @@ def edit_artist_submission(artist_id):
             artist.genres = form.genres.data
             
             db.session.commit()
+            fragment_cache.bump('artist', artist_id)
+            fragment_cache.bump('venue', *counterpart_ids(Show.artist_id, artist_id, Show.venue_id))
+            invalidate_widgets()
             flash(f'Artist {artist.name} was successfully updated!')
         else:
             for field, errors in form.errors.items():
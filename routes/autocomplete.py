@@ -0,0 +1,22 @@
+#  Autocomplete
+#  ----------------------------------------------------------------
+from flask import Blueprint, current_app, jsonify, request
+from autocomplete import MODELS, complete
+from .api import bad_request
+
+autocomplete_routes = Blueprint('autocomplete', __name__)
+
+@autocomplete_routes.route('/api/autocomplete')
+def autocomplete():
+    # /api/autocomplete?type=artist&q=gun -> {"data": [{"id": 4, "name": "Guns N Petals"}]}
+    kind = request.args.get('type', '')
+    if kind not in MODELS:
+        bad_request(f'type must be one of {", ".join(sorted(MODELS))}')
+
+    max_limit = current_app.config.get('AUTOCOMPLETE_LIMIT', 10)
+    limit = min(request.args.get('limit', max_limit, type=int) or max_limit, max_limit)
+    prefix = request.args.get('q', '').strip()
+    if not prefix:
+        return jsonify({"data": []})
+
+    return jsonify({"data": [{"id": entity_id, "name": name} for entity_id, name in complete(kind, prefix, limit)]})
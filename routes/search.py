@@ -0,0 +1,35 @@
+#  Search
+#  ----------------------------------------------------------------
+from flask import Blueprint, render_template, request, jsonify
+from models import Venue, Artist, Show
+from conditional import conditional_get
+from extensions import csrf
+from pagination import wants_json
+from search import search_entities
+
+search_routes = Blueprint('search', __name__)
+
+@csrf.exempt
+@search_routes.route('/search', methods=['GET', 'POST'])
+@conditional_get(Artist, Venue, Show)
+def search():
+  # searches artists and venues together, best matches first
+    search_term = request.values.get('search_term', '')
+
+    results = {}
+    for key, model in (("artists", Artist), ("venues", Venue)):
+        count, rows = search_entities(model, search_term)
+        results[key] = {
+            "count": count,
+            "data": [{
+                "id": row_id,
+                "name": name,
+                "num_upcoming_shows": num_upcoming_shows
+            } for row_id, name, num_upcoming_shows in rows]
+        }
+
+    if wants_json():
+        return jsonify({"search_term": search_term, **results})
+    return render_template('pages/search.html',
+                         results=results,
+                         search_term=search_term)
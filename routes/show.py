@@ -1,33 +1,62 @@
 #  Shows
 #  ----------------------------------------------------------------
-from flask import Blueprint, render_template, request, flash, redirect, url_for
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, current_app
 from models import Show, Artist, Venue
-from forms import ShowForm
-from extensions import db, csrf
+from forms import ShowForm, build_form
+from conditional import conditional_get
+from extensions import db, csrf, fragment_cache
+from pagination import keyset_paginate, wants_json
+from streaming import stream_template
+from bookings import find_conflict, is_conflict_error
+from home import invalidate_widgets
 from datetime import datetime
 
 show_routes = Blueprint('show', __name__)
 
 @show_routes.route('/shows')
+@conditional_get(Show, Venue, Artist)
 def shows():
   # displays list of shows at /shows
   # TODO: replace with real venues data.
-    shows_query = db.session.query(Show, Venue, Artist)\
+    shows_query = db.session.query(
+            Show.id,
+            Show.start_time,
+            Venue.id.label('venue_id'),
+            Venue.name.label('venue_name'),
+            Artist.id.label('artist_id'),
+            Artist.name.label('artist_name'),
+            Artist.image_link.label('artist_image_link')
+        )\
         .join(Venue, Show.venue_id == Venue.id)\
-        .join(Artist, Show.artist_id == Artist.id)\
-        .all()
-    data = []
-    for show, venue, artist in shows_query:
-        data.append({
-            "venue_id": venue.id,
-            "venue_name": venue.name,
-            "artist_id": artist.id,
-            "artist_name": artist.name,
-            "artist_image_link": artist.image_link,
-            "start_time": show.start_time.strftime('%Y-%m-%dT%H:%M:%S.000Z')
-        })
-    
-    return render_template('pages/shows.html', shows=data)
+        .join(Artist, Show.artist_id == Artist.id)
+
+    if not wants_json() and (request.args.get('stream') or current_app.config.get('SHOWS_STREAMING')):
+        # every show, fetched from a server-side cursor as the page renders
+        rows = shows_query.order_by(Show.start_time, Show.id)\
+            .yield_per(current_app.config.get('STREAM_BATCH_SIZE', 1000))
+        return stream_template('pages/shows.html', shows=(show_data(show) for show in rows))
+
+    page = keyset_paginate(
+        shows_query,
+        (Show.start_time, Show.id),
+        cursor=request.args.get('cursor')
+    )
+    links = page.links('show.shows')
+    data = [show_data(show) for show in page.items]
+
+    if wants_json():
+        return jsonify({"data": data, **links})
+    return render_template('pages/shows.html', shows=data, pagination=links)
+
+def show_data(show):
+    return {
+        "venue_id": show.venue_id,
+        "venue_name": show.venue_name,
+        "artist_id": show.artist_id,
+        "artist_name": show.artist_name,
+        "artist_image_link": show.artist_image_link,
+        "start_time": show.start_time
+    }
 
 @show_routes.route('/shows/create')
 def create_shows():
@@ -39,8 +68,13 @@ def create_shows():
 def create_show_submission():
   # called to create new shows in the db, upon submitting new show listing form
   # TODO: insert form data as a new Show record in the db, instead
-    form = ShowForm(request.form, meta={'csrf': False})
+    form = build_form(ShowForm, request.form, csrf=True)
     if form.validate():
+        errors = booking_errors(form)
+        if errors:
+            for error in errors:
+                flash(error)
+            return render_template('forms/new_show.html', form=form)
         try:
             show = Show(
                 artist_id=form.artist_id.data,
@@ -49,14 +83,18 @@ def create_show_submission():
             )
             db.session.add(show)
             db.session.commit()
+            fragment_cache.bump('venue', form.venue_id.data)
+            fragment_cache.bump('artist', form.artist_id.data)
+            invalidate_widgets()
             # on successful db insert, flash success
             flash('Show was successfully listed!')
-            # TODO: on unsuccessful db insert, flash an error instead.
-            # e.g., flash('An error occurred. Show could not be listed.')
-            # see: http://flask.pocoo.org/docs/1.0/patterns/flashing/
         except Exception as e:
             db.session.rollback()
-            flash('An error occurred. Artist ' + request.form['name'] + ' could not be listed.')
+            if is_conflict_error(e):
+                # another booking for the slot was committed after our check
+                flash('An error occurred. The venue is already booked at that time.')
+                return render_template('forms/new_show.html', form=form)
+            flash('An error occurred. Show could not be listed.')
             print(e)
         finally:
             db.session.close()
@@ -65,4 +103,16 @@ def create_show_submission():
         for field, errors in form.errors.items():
             for error in errors:
                 flash(f'Error in {field}: {error}')
-        return render_template('forms/new_show.html', form=form)
\ No newline at end of file
+        return render_template('forms/new_show.html', form=form)
+
+def booking_errors(form):
+    errors = []
+    if db.session.query(Artist.id).filter_by(id=form.artist_id.data).scalar() is None:
+        errors.append(f'Error in artist_id: No such artist {form.artist_id.data}.')
+    if db.session.query(Venue.id).filter_by(id=form.venue_id.data).scalar() is None:
+        errors.append(f'Error in venue_id: No such venue {form.venue_id.data}.')
+    else:
+        conflict = find_conflict(form.venue_id.data, form.start_time.data)
+        if conflict is not None:
+            errors.append(f'Error in start_time: The venue is already booked for a show at {conflict:%Y-%m-%d %H:%M}.')
+    return errors
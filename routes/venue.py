@@ -2,45 +2,57 @@
 #  ----------------------------------------------------------------
 from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
 from models import Venue, Artist, Show
-from forms import VenueForm
-from extensions import db, csrf
+from forms import VenueForm, build_form
+from conditional import conditional_get
+from extensions import db, csrf, fragment_cache
+from queries import split_shows, counterpart_ids
+from pagination import keyset_paginate, wants_json
+from search import search_entities
+from genres import filter_by_genre
+from home import invalidate_widgets
+from deletion import delete_entities
 from datetime import datetime
 
 venue_routes = Blueprint('venue', __name__)
 
 @venue_routes.route('/venues')
+@conditional_get(Venue, Show)
 def venues():
   # TODO: replace with real venues data.
-    locations = db.session.query(Venue.city, Venue.state).distinct().all()
-    currentTime = datetime.now()
-    
-    data = []
-    for location in locations:
-        venues_in_location = Venue.query.filter_by(
-            city=location.city, 
-            state=location.state
-        ).all()
-        
-        venueData = []
-        for venue in venues_in_location:
-            upcoming_shows = db.session.query(Show).filter(
-                Show.venue_id == venue.id,
-                Show.start_time > currentTime
-            ).count()
-            
-            venueData.append({
-                "id": venue.id,
-                "name": venue.name,
-                "num_upcoming_shows": upcoming_shows
-            })
-        
-        data.append({
-            "city": location.city,
-            "state": location.state,
-            "venues": venueData
+    venues_query = db.session.query(
+            Venue.id,
+            Venue.name,
+            Venue.city,
+            Venue.state,
+            Venue.upcoming_shows_count.label('num_upcoming_shows')
+        )
+    venues_query, genres = filter_by_genre(venues_query, Venue)
+
+    page = keyset_paginate(
+        venues_query,
+        (Venue.name, Venue.id),
+        cursor=request.args.get('cursor')
+    )
+    links = page.links('venue.venues')
+
+    # the page is ordered by name, so gather its venues per area in one pass
+    areas = {}
+    for venue in page.items:
+        area = areas.setdefault((venue.city, venue.state), {
+            "city": venue.city,
+            "state": venue.state,
+            "venues": []
         })
-    
-    return render_template('pages/venues.html', areas=data)
+        area["venues"].append({
+            "id": venue.id,
+            "name": venue.name,
+            "num_upcoming_shows": venue.num_upcoming_shows
+        })
+    data = sorted(areas.values(), key=lambda area: (area["city"] or '', area["state"] or ''))
+
+    if wants_json():
+        return jsonify({"data": data, **links})
+    return render_template('pages/venues.html', areas=data, pagination=links, genres=genres)
 
 @csrf.exempt
 @venue_routes.route('/venues/search', methods=['POST'])
@@ -50,74 +62,54 @@ def search_venues():
   # search for "Music" should return "The Musical Hop" and "Park Square Live Music & Coffee"
     search_term = request.form.get('search_term', '')
     
-    venues = Venue.query.filter(
-        db.or_(
-            Venue.name.ilike(f'%{search_term}%'),
-            Venue.city.ilike(f'%{search_term}%'),
-            Venue.state.ilike(f'%{search_term}%')
-        )
-    ).all()
+    count, venues = search_entities(Venue, search_term)
 
     response = {
-        "count": len(venues),
-        "data": []
+        "count": count,
+        "data": [{
+            "id": venue_id,
+            "name": name,
+            "num_upcoming_shows": num_upcoming_shows
+        } for venue_id, name, num_upcoming_shows in venues]
     }
 
-    current_time = datetime.now()
-    
-    for venue in venues:
-        upcoming_shows = db.session.query(Show).filter(
-            Show.venue_id == venue.id,
-            Show.start_time > current_time
-        ).count()
-
-        response["data"].append({
-            "id": venue.id,
-            "name": venue.name,
-            "num_upcoming_shows": upcoming_shows
-        })
-
     return render_template('pages/search_venues.html', 
                          results=response, 
                          search_term=search_term)
 
 @venue_routes.route('/venues/<int:venue_id>')
+@conditional_get(Venue, Artist, Show)
 def show_venue(venue_id):
   # shows the venue page with the given venue_id
   # TODO: replace with real venue data from the venues table, using venue_id
-    venue = Venue.query.get_or_404(venue_id)
+    venue_html = fragment_cache.get_or_render(
+        'venue', venue_id, lambda: render_venue_detail(venue_id)
+    )
+    return render_template('pages/show_venue.html', venue_html=venue_html, venue_id=venue_id)
 
-    current_time = datetime.now()
-
-    past_shows_query = db.session.query(Show, Artist)\
-        .join(Artist)\
-        .filter(Show.venue_id == venue_id)\
-        .filter(Show.start_time < current_time)\
-        .all()
+def render_venue_detail(venue_id):
+    venue = Venue.query.get_or_404(venue_id)
 
-    upcoming_shows_query = db.session.query(Show, Artist)\
-        .join(Artist)\
+    shows_query = db.session.query(
+            Show.start_time,
+            Artist.id.label('artist_id'),
+            Artist.name.label('artist_name'),
+            Artist.image_link.label('artist_image_link')
+        )\
+        .join(Artist, Show.artist_id == Artist.id)\
         .filter(Show.venue_id == venue_id)\
-        .filter(Show.start_time >= current_time)\
+        .order_by(Show.start_time)\
         .all()
 
-    past_shows = []
-    for show, artist in past_shows_query:
-        past_shows.append({
-            "artist_id": artist.id,
-            "artist_name": artist.name,
-            "artist_image_link": artist.image_link,
-            "start_time": show.start_time.strftime('%Y-%m-%dT%H:%M:%S.000Z')
-        })
-
-    upcoming_shows = []
-    for show, artist in upcoming_shows_query:
-        upcoming_shows.append({
-            "artist_id": artist.id,
-            "artist_name": artist.name,
-            "artist_image_link": artist.image_link,
-            "start_time": show.start_time.strftime('%Y-%m-%dT%H:%M:%S.000Z')
-        })
+    past_shows, upcoming_shows = [
+        [{
+            "artist_id": show.artist_id,
+            "artist_name": show.artist_name,
+            "artist_image_link": show.artist_image_link,
+            "start_time": show.start_time
+        } for show in shows]
+        for shows in split_shows(shows_query)
+    ]
 
     data = {
         "id": venue.id,
@@ -137,7 +129,7 @@ def show_venue(venue_id):
         "past_shows_count": len(past_shows),
         "upcoming_shows_count": len(upcoming_shows)
     }
-    return render_template('pages/show_venue.html', venue=data)
+    return render_template('pages/venue_detail.html', venue=data)
 
 #  Create Venue
 #  ----------------------------------------------------------------
@@ -151,7 +143,7 @@ def create_venue_form():
 def create_venue_submission():
   # TODO: insert form data as a new Venue record in the db, instead
   # TODO: modify data to be the data object returned from db insertion
-    form = VenueForm(request.form, meta={'csrf': False})
+    form = build_form(VenueForm, request.form, csrf=True)
     if form.validate():
         try:
             venue = Venue(
@@ -169,6 +161,7 @@ def create_venue_submission():
             )
             db.session.add(venue)
             db.session.commit()
+            invalidate_widgets()
             # on successful db insert, flash success
             flash('Venue ' + request.form['name'] + ' was successfully listed!')
             # TODO: on unsuccessful db insert, flash an error instead.
@@ -188,32 +181,19 @@ def create_venue_submission():
         return render_template('forms/new_venue.html', form=form)
     
 
-@venue_routes.route('/venues/<venue_id>', methods=['DELETE'])
+@venue_routes.route('/venues/<int:venue_id>', methods=['DELETE'])
 def delete_venue(venue_id):
   # TODO: Complete this endpoint for taking a venue_id, and using
   # SQLAlchemy ORM to delete a record. Handle cases where the session commit could fail.
 
   # BONUS CHALLENGE: Implement a button to delete a Venue on a Venue Page, have it so that
   # clicking that button delete it from the db then redirect the user to the homepage
-    error = False
     try:
-        Show.query.filter_by(venue_id=venue_id).delete()
-        venue = Venue.query.get(venue_id)
-        venueName = venue.name
-        
-        db.session.delete(venue)
-        db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'message': f'Venue {venueName} was successfully deleted!',
-            'redirect_url': '/'
-        })
+        # one DELETE; the venue's shows are removed by ON DELETE CASCADE
+        deleted = delete_entities(Venue, [venue_id])
     except Exception as e:
-        error = True
-        db.session.rollback()
         print(e)
-        flash('An error occurred. Venue ' + vanueName + ' could not be deleted.')
+        flash(f'An error occurred. Venue {venue_id} could not be deleted.')
         return jsonify({
             'success': False,
             'redirect_url': f'/venues/{venue_id}'
@@ -221,6 +201,17 @@ def delete_venue(venue_id):
     finally:
         db.session.close()
 
+    if venue_id not in deleted:
+        response = jsonify({'success': False, 'redirect_url': '/venues'})
+        response.status_code = 404
+        return response
+
+    return jsonify({
+        'success': True,
+        'message': f'Venue {deleted[venue_id]} was successfully deleted!',
+        'redirect_url': '/'
+    })
+
 
 @venue_routes.route('/venues/<int:venue_id>/edit', methods=['GET'])
 def edit_venue(venue_id):
@@ -253,9 +244,9 @@ def edit_venue(venue_id):
 def edit_venue_submission(venue_id):
     try:
         venue = Venue.query.get_or_404(venue_id)
-        form = VenueForm(request.form)
+        form = build_form(VenueForm, request.form, csrf=True)
         
-        if form.validate_on_submit():
+        if form.validate():
             venue.name = form.name.data
             venue.city = form.city.data
             venue.state = form.state.data
@@ -269,6 +260,9 @@ def edit_venue_submission(venue_id):
             venue.genres = form.genres.data
             
             db.session.commit()
+            fragment_cache.bump('venue', venue_id)
+            fragment_cache.bump('artist', *counterpart_ids(Show.venue_id, venue_id, Show.artist_id))
+            invalidate_widgets()
             flash(f'Venue {venue.name} was successfully updated!')
         else:
             for field, errors in form.errors.items():
@@ -0,0 +1,144 @@
+# Search.
+#----------------------------------------------------------------------------#
+# Case-insensitive partial-match search over name, city and state, ranked by
+# trigram similarity. On PostgreSQL the ILIKE filter on name and city is
+# served by pg_trgm GIN indexes and ranked with similarity(); state is an
+# enum, so the states matching the term are found in Python and compared
+# with IN. Other databases (SQLite test runs) fall back to an in-memory
+# n-gram index built from the table.
+import re
+from collections import defaultdict
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from extensions import db
+from models import Venue, Artist
+from enums import STATE_VALUES
+
+SEARCH_FIELDS = ('name', 'city', 'state')
+TEXT_FIELDS = ('name', 'city')
+
+def escape_like(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def trigrams(text):
+    # pg_trgm style: every word padded with two leading blanks and one trailing
+    grams = set()
+    for word in re.findall(r'\w+', (text or '').lower()):
+        padded = '  ' + word + ' '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def similarity(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+class NgramIndex:
+    # Posting lists of raw (unpadded) n-grams of the lower-cased fields. A term
+    # of n characters or more can only match documents holding all of its
+    # n-grams, so candidates are the intersection of its posting lists and are
+    # then confirmed with a substring check.
+    def __init__(self, n=3):
+        self.n = n
+        self.postings = defaultdict(set)
+        self.documents = {}
+
+    def _grams(self, text):
+        return {text[i:i + self.n] for i in range(len(text) - self.n + 1)}
+
+    def add(self, doc_id, name, fields):
+        fields = tuple((field or '').lower() for field in fields)
+        self.documents[doc_id] = (name, fields, [trigrams(field) for field in fields])
+        for field in fields:
+            for gram in self._grams(field):
+                self.postings[gram].add(doc_id)
+
+    def search(self, term, limit=None):
+        term = term.lower()
+        grams = self._grams(term)
+        if grams:
+            candidates = set.intersection(*[self.postings.get(gram, set()) for gram in grams])
+        else:
+            candidates = self.documents.keys()
+
+        term_trigrams = trigrams(term)
+        matches = []
+        for doc_id in candidates:
+            name, fields, field_trigrams = self.documents[doc_id]
+            if any(term in field for field in fields):
+                score = max(similarity(term_trigrams, grams) for grams in field_trigrams)
+                matches.append((doc_id, name, score))
+
+        matches.sort(key=lambda match: (-match[2], match[1] or '', match[0]))
+        return len(matches), matches[:limit] if limit else matches
+
+_ngram_indexes = {}
+
+def invalidate(model):
+    # bulk loads (bulk_insert_mappings) skip the mapper events below
+    _ngram_indexes.pop(model, None)
+
+def _invalidate(mapper, connection, target):
+    _ngram_indexes.pop(type(target), None)
+
+for model in (Venue, Artist):
+    for identifier in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(model, identifier, _invalidate)
+
+@event.listens_for(Session, 'after_bulk_update')
+@event.listens_for(Session, 'after_bulk_delete')
+def _invalidate_bulk(context):
+    # query.update() / query.delete() bypass the mapper events
+    _ngram_indexes.pop(context.mapper.class_, None)
+
+def _ngram_index(model):
+    index = _ngram_indexes.get(model)
+    if index is None:
+        index = NgramIndex()
+        columns = [getattr(model, field) for field in SEARCH_FIELDS]
+        for row in db.session.query(model.id, model.name, *columns):
+            index.add(row[0], row[1], row[2:])
+        _ngram_indexes[model] = index
+    return index
+
+def matching_states(term):
+    term = term.lower()
+    return [state for state in STATE_VALUES if term in state.lower()]
+
+def _trigram_search(model, term, limit):
+    columns = [getattr(model, field) for field in TEXT_FIELDS]
+    pattern = f'%{escape_like(term)}%'
+    match = db.or_(*[column.ilike(pattern, escape='\\') for column in columns])
+    states = matching_states(term)
+    if states:
+        match = db.or_(match, model.state.in_(states))
+    columns.append(db.cast(model.state, db.String))
+    score = db.func.greatest(*[db.func.coalesce(db.func.similarity(column, term), 0) for column in columns])
+
+    count = db.session.query(db.func.count(model.id)).filter(match).scalar()
+    rows = db.session.query(model.id, model.name, model.upcoming_shows_count)\
+        .filter(match)\
+        .order_by(score.desc(), model.name, model.id)\
+        .limit(limit)\
+        .all()
+    return count, rows
+
+def _ngram_search(model, term, limit):
+    # the index holds no show counts (counters.py updates them without the
+    # ORM), so the page of matches is completed with one primary key lookup
+    count, matches = _ngram_index(model).search(term, limit)
+    ids = [doc_id for doc_id, _, _ in matches]
+    counts = dict(db.session.query(model.id, model.upcoming_shows_count).filter(model.id.in_(ids))) if ids else {}
+    return count, [(doc_id, name, counts.get(doc_id, 0)) for doc_id, name, _ in matches]
+
+def search_entities(model, term, limit=None):
+    # Returns (total number of matches, [(id, name, upcoming shows), ...]
+    # best first).
+    if limit is None:
+        limit = current_app.config.get('SEARCH_RESULT_LIMIT', 50)
+    term = (term or '').strip()
+
+    if db.engine.dialect.name == 'postgresql':
+        return _trigram_search(model, term, limit)
+    return _ngram_search(model, term, limit)
@@ -2,3 +2,49 @@ window.parseISOString = function parseISOString(s) {
   var b = s.split(/\D+/);
   return new Date(Date.UTC(b[0], --b[1], b[2], b[3], b[4], b[5], b[6]));
 };
+
+window.debounce = function debounce(fn, wait) {
+  var timer;
+  return function () {
+    var args = arguments, self = this;
+    clearTimeout(timer);
+    timer = setTimeout(function () { fn.apply(self, args); }, wait);
+  };
+};
+
+// Name pickers on the show form: suggestions come from /api/autocomplete and
+// choosing one fills in the id field named by data-target.
+document.querySelectorAll('[data-autocomplete]').forEach(function (input) {
+  var list = document.getElementById(input.getAttribute('list'));
+  var target = document.getElementById(input.dataset.target);
+  var choices = {};
+  var latest = 0;
+
+  var lookup = window.debounce(function (q) {
+    var request = ++latest;
+    fetch('/api/autocomplete?type=' + encodeURIComponent(input.dataset.autocomplete) + '&q=' + encodeURIComponent(q))
+      .then(function (response) { return response.json(); })
+      .then(function (body) {
+        // a slower, older response must not replace newer suggestions
+        if (request !== latest) return;
+        choices = {};
+        list.innerHTML = '';
+        body.data.forEach(function (match) {
+          var label = match.name + ' (#' + match.id + ')';
+          choices[label] = match.id;
+          var option = document.createElement('option');
+          option.value = label;
+          list.appendChild(option);
+        });
+      });
+  }, 150);
+
+  input.addEventListener('input', function () {
+    if (choices.hasOwnProperty(input.value)) {
+      target.value = choices[input.value];
+      return;
+    }
+    var q = input.value.trim();
+    if (q) lookup(q);
+  });
+});
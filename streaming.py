@@ -0,0 +1,13 @@
+# Streaming.
+#----------------------------------------------------------------------------#
+from flask import Response, current_app, stream_with_context
+
+def stream_template(template_name, **context):
+    # Like render_template, but the page is sent as Jinja generates it, so an
+    # iterable in the context (e.g. a yield_per query) is consumed lazily and
+    # the first bytes leave before the last rows are fetched.
+    app = current_app._get_current_object()
+    app.update_template_context(context)
+    stream = app.jinja_env.get_template(template_name).stream(context)
+    stream.enable_buffering(app.config.get('TEMPLATE_STREAM_BUFFER', 100))
+    return Response(stream_with_context(stream))
@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import event
+from extensions import db
+from tests.conftest import fyyur_app, database, run_seed
+
+def scales(config, option):
+    return [int(scale) for scale in config.getoption(option).split(',') if scale.strip()]
+
+def pytest_generate_tests(metafunc):
+    # one seeded database per scale, shared by the tests of a module
+    if 'dataset' in metafunc.fixturenames:
+        shows = scales(metafunc.config, 'scales')
+        metafunc.parametrize('dataset', shows, ids=[f'{count}-shows' for count in shows],
+                             indirect=True, scope='module')
+
+@pytest.fixture(scope='module')
+def dataset(request):
+    # 'flask seed' with one venue per 100 shows and one artist per 50
+    shows = request.param
+    with database():
+        run_seed(fyyur_app, venues=max(10, shows // 100), artists=max(20, shows // 50), shows=shows)
+        yield shows
+
+@pytest.fixture
+def sql_counter():
+    # statements sent since the last reset; the benchmarks read it per request
+    counter = [0]
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        counter[0] += 1
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count_statement)
+    yield counter
+    event.remove(engine, 'before_cursor_execute', count_statement)
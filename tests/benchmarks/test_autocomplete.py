@@ -0,0 +1,48 @@
+#  Autocomplete benchmark
+#  ----------------------------------------------------------------
+#  pytest tests/benchmarks/test_autocomplete.py
+#
+#  Builds a PrefixTrie of 100k venue and artist names from the 'flask seed'
+#  vocabulary. It times top-10 lookups for short, long, multi-word and
+#  missing prefixes, and a limit above top_k that falls back to the subtree
+#  scan. The answers are checked against a scan of every name, which is also
+#  timed for comparison.
+import random
+import time
+import pytest
+from autocomplete import PrefixTrie
+from commands.seed import VENUE_WORDS, ARTIST_WORDS
+from tests.test_autocomplete import expected
+
+NAMES = 100000
+PREFIXES = ['g', 'go', 'golden', 'golden e', 'hall', 'zz']
+
+@pytest.fixture(scope='module')
+def trie():
+    rng = random.Random(42)
+    names = {
+        entity_id: ' '.join(rng.choice(words) for words in rng.choice((VENUE_WORDS, ARTIST_WORDS)))
+        for entity_id in range(1, NAMES + 1)
+    }
+    started = time.perf_counter()
+    trie = PrefixTrie(top_k=10)
+    for entity_id, name in names.items():
+        trie.add(entity_id, name)
+    return trie, names, time.perf_counter() - started
+
+@pytest.mark.parametrize('prefix', PREFIXES)
+def test_complete(benchmark, trie, prefix):
+    trie, names, build_seconds = trie
+    benchmark.group = f'autocomplete {NAMES} names'
+    benchmark.extra_info.update({'names': NAMES, 'build_s': round(build_seconds, 2)})
+    assert benchmark(trie.complete, prefix, 10) == expected(names, prefix, 10)
+
+def test_complete_beyond_top_k(benchmark, trie):
+    trie, names, build_seconds = trie
+    benchmark.group = f'autocomplete {NAMES} names'
+    assert benchmark(trie.complete, 'go', 25) == expected(names, 'go', 25)
+
+def test_scan_every_name(benchmark, trie):
+    trie, names, build_seconds = trie
+    benchmark.group = f'autocomplete {NAMES} names'
+    assert benchmark.pedantic(expected, (names, 'go', 10), rounds=3) == trie.complete('go', 10)
@@ -0,0 +1,73 @@
+#  Booking validation benchmark
+#  ----------------------------------------------------------------
+#  pytest tests/benchmarks/test_bookings.py
+#
+#  Times the overlap check for a new show as one venue's history grows. It
+#  compares a scan of every start time at the venue, find_conflict's range
+#  scan on the (venue_id, start_time) index, and a warm BookingIndex bisect.
+#  It also times the full POST /shows/create that rejects the booking.
+#  find_conflict and BookingIndex should stay flat while the scan grows with
+#  the history.
+from datetime import datetime, timedelta
+import pytest
+from extensions import db
+from models import Show
+from bookings import BookingIndex, find_conflict, slot_length
+from tests.conftest import fyyur_app, database, run_seed
+
+HISTORY = [100, 1000, 10000]
+START = datetime(2020, 1, 1, 12)
+
+def scan_conflict(venue_id, start_time):
+    # every start time at the venue, checked in Python
+    slot = slot_length()
+    for (existing,) in db.session.query(Show.start_time).filter(Show.venue_id == venue_id):
+        if start_time - slot < existing < start_time + slot:
+            return existing
+    return None
+
+@pytest.fixture(scope='module', params=HISTORY, ids=[f'{count}-shows' for count in HISTORY])
+def history(request):
+    # one venue booked back to back every four hours; the new show lands in
+    # the middle of the history, half an hour into a booked slot
+    count = request.param
+    with database():
+        run_seed(fyyur_app, venues=1, artists=1, shows=0)
+        db.session.bulk_insert_mappings(Show, [
+            {"venue_id": 1, "artist_id": 1, "start_time": START + timedelta(hours=4 * number)}
+            for number in range(count)
+        ])
+        db.session.commit()
+        booked = START + timedelta(hours=4 * (count // 2))
+        yield count, booked, booked + timedelta(minutes=30)
+
+def test_scan(benchmark, history):
+    count, booked, start_time = history
+    benchmark.group = f'booking check {count} shows'
+    assert benchmark(scan_conflict, 1, start_time) == booked
+
+def test_find_conflict(benchmark, history):
+    count, booked, start_time = history
+    benchmark.group = f'booking check {count} shows'
+    assert benchmark(find_conflict, 1, start_time) == booked
+
+def test_booking_index(benchmark, history):
+    count, booked, start_time = history
+    benchmark.group = f'booking check {count} shows'
+    index = BookingIndex()
+    index.conflict(1, start_time)
+    assert benchmark(index.conflict, 1, start_time) == booked
+
+def test_create_show_rejected(benchmark, history):
+    count, booked, start_time = history
+    benchmark.group = f'booking check {count} shows'
+    client = fyyur_app.test_client()
+    data = {"artist_id": 1, "venue_id": 1, "start_time": start_time.strftime('%Y-%m-%d %H:%M:%S')}
+
+    def create_show():
+        return client.post('/shows/create', data=data)
+
+    response = benchmark(create_show)
+    assert response.status_code == 200
+    assert f'already booked for a show at {booked:%Y-%m-%d %H:%M}' in response.get_data(as_text=True)
+    assert db.session.query(Show.id).count() == count
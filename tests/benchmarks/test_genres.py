@@ -0,0 +1,84 @@
+#  Genre filter benchmark
+#  ----------------------------------------------------------------
+#  pytest tests/benchmarks/test_genres.py --genre-scales 10000,1000000
+#
+#  Seeds artists with 'flask seed' at each scale and times the any/all genre
+#  filters with each GENRE_STORAGE: the genres ARRAY with its GIN index
+#  ('array', PostgreSQL only), the genre_mask bitwise AND ('mask') and the
+#  genre / artist_genre link tables ('table'). It times the first listing page
+#  and a count of every match. All modes must agree with the genres arrays.
+import pytest
+from extensions import db
+from models import Artist
+from genres import genre_filter, rebuild_links
+from tests.conftest import fyyur_app, database, run_seed
+from tests.benchmarks.conftest import scales
+
+MODES = ['array', 'mask', 'table']
+FILTERS = [
+    (['Jazz'], 'any'),
+    (['Jazz', 'Blues', 'Folk'], 'any'),
+    (['Rock n Roll', 'Soul'], 'all'),
+]
+
+def pytest_generate_tests(metafunc):
+    if 'artists' in metafunc.fixturenames:
+        counts = scales(metafunc.config, 'genre_scales')
+        metafunc.parametrize('artists', counts, ids=[f'{count}-artists' for count in counts],
+                             indirect=True, scope='module')
+
+@pytest.fixture(scope='module')
+def artists(request):
+    count = request.param
+    with database():
+        run_seed(fyyur_app, venues=10, artists=count, shows=0)
+        rebuild_links(Artist)
+        db.session.execute('ANALYZE')
+        db.session.commit()
+        genres = dict(db.session.query(Artist.id, Artist.genres))
+        yield count, genres
+
+@pytest.fixture
+def storage():
+    # sets GENRE_STORAGE for one test
+    previous = fyyur_app.config.get('GENRE_STORAGE')
+
+    def use(mode):
+        if mode == 'array' and db.engine.dialect.name != 'postgresql':
+            pytest.skip('the array genre filter needs PostgreSQL')
+        fyyur_app.config['GENRE_STORAGE'] = mode
+
+    yield use
+    fyyur_app.config['GENRE_STORAGE'] = previous
+
+def matching(genres, names, match):
+    test = all if match == 'all' else any
+    return {artist_id for artist_id, values in genres.items() if test(name in values for name in names)}
+
+def filter_id(names, match):
+    return f'{match}:{"+".join(names)}'
+
+@pytest.mark.parametrize('names, match', FILTERS, ids=[filter_id(*f) for f in FILTERS])
+@pytest.mark.parametrize('mode', MODES)
+def test_genre_page(benchmark, artists, storage, mode, names, match):
+    count, genres = artists
+    storage(mode)
+    benchmark.group = f'genre page {count} artists {filter_id(names, match)}'
+    query = db.session.query(Artist.id)\
+        .filter(genre_filter(Artist, names, match))\
+        .order_by(Artist.name, Artist.id)\
+        .limit(50)
+    page = [row[0] for row in benchmark(query.all)]
+    expected = matching(genres, names, match)
+    assert set(page) <= expected
+    assert len(page) == min(50, len(expected))
+
+@pytest.mark.parametrize('names, match', FILTERS, ids=[filter_id(*f) for f in FILTERS])
+@pytest.mark.parametrize('mode', MODES)
+def test_genre_count(benchmark, artists, storage, mode, names, match):
+    count, genres = artists
+    storage(mode)
+    benchmark.group = f'genre count {count} artists {filter_id(names, match)}'
+    query = db.session.query(db.func.count(Artist.id))\
+        .filter(genre_filter(Artist, names, match))
+    assert benchmark(query.scalar) == len(matching(genres, names, match))
@@ -0,0 +1,129 @@
+#  Query plan checks
+#  ----------------------------------------------------------------
+#  pytest tests/benchmarks/test_query_plans.py --scales 1000,100000
+#
+#  EXPLAINs the hot Show/Venue/Artist predicates once with their index and
+#  once with it dropped, asserts the first plan reads the index and the
+#  second does not, and times the query both ways. The plans are kept in
+#  extra_info. On SQLite the trigram indexes are plain b-trees on name, which
+#  serve the name order as well, so they count (and are dropped) alongside
+#  the (name, id) ones. PostgreSQL prefers sequential scans on small tables, so there
+#  the plan is only asserted from 100k shows up; the GIN genre indexes are
+#  PostgreSQL only.
+import itertools
+from contextlib import contextmanager
+from datetime import datetime
+import pytest
+from flask import current_app
+from extensions import db
+from models import Venue, Artist, Show
+from genres import genre_filter
+
+# the seeded ids start at 1 in the fresh test database
+VENUE_ID = ARTIST_ID = 1
+
+def venue_shows():
+    return db.session.query(Show.start_time, Show.artist_id)\
+        .filter(Show.venue_id == VENUE_ID)\
+        .order_by(Show.start_time)
+
+def artist_upcoming():
+    return db.session.query(db.func.count(Show.id))\
+        .filter(Show.artist_id == ARTIST_ID, Show.start_time > datetime.now())
+
+def shows_page():
+    return db.session.query(Show.id, Show.start_time)\
+        .order_by(Show.start_time, Show.id)\
+        .limit(50)
+
+def venues_page():
+    return db.session.query(Venue.id, Venue.name)\
+        .order_by(Venue.name, Venue.id)\
+        .limit(50)
+
+def artists_page():
+    return db.session.query(Artist.id, Artist.name)\
+        .filter(db.tuple_(Artist.name, Artist.id) > db.tuple_('M', 0))\
+        .order_by(Artist.name, Artist.id)\
+        .limit(50)
+
+def venue_genres():
+    return db.session.query(Venue.id)\
+        .filter(genre_filter(Venue, ['Jazz']))\
+        .limit(50)
+
+# (label, indexes serving it, query, postgresql only)
+QUERIES = [
+    ('venue shows', ('ix_Show_venue_id_start_time',), venue_shows, False),
+    ('artist upcoming count', ('ix_Show_artist_id_start_time',), artist_upcoming, False),
+    ('shows page', ('ix_Show_start_time_id',), shows_page, False),
+    ('venues page', ('ix_Venue_name_id', 'ix_Venue_name_trgm'), venues_page, False),
+    ('artists page after cursor', ('ix_Artist_name_id', 'ix_Artist_name_trgm'), artists_page, False),
+    ('venue genre filter', ('ix_Venue_genres',), venue_genres, True),
+]
+
+# sqlite3 caches prepared statements, and a cached EXPLAIN does not notice a
+# dropped index; a fresh comment per call keeps the text unique
+_explains = itertools.count()
+
+def postgresql():
+    return db.engine.dialect.name == 'postgresql'
+
+def explain(query):
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    prefix = 'EXPLAIN ' if postgresql() else 'EXPLAIN QUERY PLAN '
+    sql = f'{prefix}{compiled} /* {next(_explains)} */'
+    rows = db.session.connection().execute(sql, params).fetchall()
+    db.session.commit()
+    return '\n'.join(str(row[-1]) for row in rows)
+
+@contextmanager
+def dropped(names):
+    indexes = [index for table in db.metadata.tables.values()
+               for index in table.indexes if index.name in names]
+    db.session.commit()
+    for index in indexes:
+        index.drop(db.engine)
+    try:
+        yield
+    finally:
+        db.session.commit()
+        for index in indexes:
+            index.create(db.engine)
+
+@pytest.fixture(scope='module')
+def analyzed(dataset):
+    db.session.execute('ANALYZE')
+    db.session.commit()
+    return dataset
+
+@pytest.mark.parametrize('indexed', [True, False], ids=['indexed', 'dropped'])
+@pytest.mark.parametrize('label, indexes, build, postgresql_only', QUERIES, ids=[query[0] for query in QUERIES])
+def test_query_plan(benchmark, analyzed, label, indexes, build, postgresql_only, indexed):
+    if postgresql_only and not postgresql():
+        pytest.skip('GIN indexes need PostgreSQL')
+    if postgresql_only:
+        # genre_filter only reads the GIN index in 'array' storage
+        current_app.config['GENRE_STORAGE'], storage = 'array', current_app.config.get('GENRE_STORAGE')
+
+    benchmark.group = f'plans {analyzed} shows: {label}'
+    try:
+        if indexed:
+            plan = explain(build())
+            benchmark(lambda: build().all())
+        else:
+            with dropped(indexes):
+                plan = explain(build())
+                benchmark(lambda: build().all())
+    finally:
+        if postgresql_only:
+            current_app.config['GENRE_STORAGE'] = storage
+    benchmark.extra_info.update({'shows': analyzed, 'indexes': indexes, 'plan': plan})
+
+    if postgresql() and analyzed < 100000:
+        return
+    used = [name for name in indexes if name in plan]
+    assert used if indexed else not used, plan
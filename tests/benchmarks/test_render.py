@@ -0,0 +1,69 @@
+#  Render benchmark
+#  ----------------------------------------------------------------
+#  pytest tests/benchmarks/test_render.py
+#
+#  Renders pages/shows.html with 10k shows through each datetime filter path:
+#  the original one (ISO strings reparsed by dateutil, then
+#  babel.dates.format_datetime), the current filter fed the same strings, and
+#  the current filter fed the datetime objects the routes now pass. All three
+#  must produce the same page.
+import random
+from datetime import datetime, timedelta
+import babel.dates
+import dateutil.parser
+import pytest
+from flask import render_template
+from app import DATETIME_FORMATS, format_datetime
+from tests.conftest import fyyur_app
+
+SHOWS = 10000
+
+def original_format_datetime(value, format='medium'):
+    # the filter before the formatters were compiled and cached
+    date = dateutil.parser.parse(value)
+    return babel.dates.format_datetime(date, DATETIME_FORMATS.get(format, format), locale='en')
+
+def shows(as_strings):
+    rng = random.Random(42)
+    start = datetime(2026, 1, 1, 20, 0)
+    rows = []
+    for number in range(SHOWS):
+        start_time = start + timedelta(days=rng.randrange(365), minutes=30 * rng.randrange(8))
+        rows.append({
+            "venue_id": number % 100 + 1,
+            "venue_name": f'Venue {number % 100}',
+            "artist_id": number % 200 + 1,
+            "artist_name": f'Artist {number % 200}',
+            "artist_image_link": f'https://images.example.com/artists/{number % 200}.jpg',
+            "start_time": start_time.strftime('%Y-%m-%dT%H:%M:%S.000Z') if as_strings else start_time
+        })
+    return rows
+
+# (label, filter, shows as ISO strings)
+PATHS = [
+    ('original filter, strings', original_format_datetime, True),
+    ('cached filter, strings', format_datetime, True),
+    ('cached filter, datetimes', format_datetime, False),
+]
+
+@pytest.fixture(scope='module')
+def expected():
+    with fyyur_app.test_request_context('/shows'):
+        return render_template('pages/shows.html', shows=shows(False), pagination={"next": None, "prev": None})
+
+@pytest.mark.parametrize('label, filter, as_strings', PATHS, ids=[path[0] for path in PATHS])
+def test_render_shows(benchmark, expected, label, filter, as_strings):
+    benchmark.group = f'render {SHOWS} shows'
+    rows = shows(as_strings)
+    filters = fyyur_app.jinja_env.filters
+    filters['datetime'] = filter
+    try:
+        with fyyur_app.test_request_context('/shows'):
+            page = benchmark.pedantic(
+                lambda: render_template('pages/shows.html', shows=rows, pagination={"next": None, "prev": None}),
+                rounds=3, warmup_rounds=1
+            )
+    finally:
+        filters['datetime'] = format_datetime
+    benchmark.extra_info['shows'] = SHOWS
+    assert page == expected
@@ -0,0 +1,63 @@
+#  Route benchmarks
+#  ----------------------------------------------------------------
+#  pytest tests/benchmarks/test_routes.py --scales 1000,100000,1000000
+#
+#  Every read route of the blueprints, requested through the test client
+#  against databases seeded by 'flask seed' at each scale. pytest-benchmark
+#  reports the timing table; p50/p95 and SQL statements per request are kept
+#  in extra_info (see --benchmark-json). The same requests as 'flask bench'.
+import random
+import time
+import pytest
+from commands.bench import routes, percentile
+from extensions import db
+from genres import storage
+from tests.conftest import fyyur_app
+
+ROUNDS = 20
+
+LABELS = [
+    'index', 'venue.venues', 'venue.venues?genre', 'venue.show_venue', 'venue.search_venues',
+    'artist.artists', 'artist.artists?genre', 'artist.show_artist', 'artist.search_artists',
+    'show.shows', 'search.search', 'api.list_venues', 'api.list_shows', 'autocomplete.autocomplete',
+]
+
+@pytest.mark.parametrize('label', LABELS)
+def test_route(benchmark, dataset, sql_counter, label):
+    if label.endswith('?genre') and storage() == 'array' and db.engine.dialect.name != 'postgresql':
+        pytest.skip('the array genre filter needs PostgreSQL')
+    benchmark.group = f'routes {dataset} shows'
+    requests = {
+        name: (method, targets) for name, method, targets in routes(random.Random(42), ROUNDS + 1)
+    }
+    method, targets = requests[label]
+    targets = iter(targets)
+    client = fyyur_app.test_client()
+    timings = []
+    sql = []
+
+    def request():
+        target = next(targets)
+        url, data = target if isinstance(target, tuple) else (target, None)
+        sql_counter[0] = 0
+        started = time.perf_counter()
+        response = getattr(client, method)(url, data=data)
+        response.get_data()
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code < 500, f'{method.upper()} {url} returned {response.status_code}'
+        sql.append(sql_counter[0])
+
+    # the first request is a warm-up, as in 'flask bench'; the requests are
+    # timed here too, so the percentiles hold under --benchmark-disable,
+    # which runs the function once
+    request()
+    timings.clear()
+    sql.clear()
+    benchmark.pedantic(request, rounds=ROUNDS, iterations=1)
+
+    benchmark.extra_info.update({
+        'shows': dataset,
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'sql_per_request': sum(sql) / len(sql),
+    })
@@ -0,0 +1,82 @@
+import os
+import sys
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('FYYUR_CONFIG', 'testing')
+
+from app import app as fyyur_app
+from extensions import db, fragment_cache
+from commands.seed import seed_command
+import autocomplete
+import search
+
+try:
+    import pytest_benchmark
+except ImportError:
+    collect_ignore = ['benchmarks']
+
+def pytest_addoption(parser):
+    group = parser.getgroup('fyyur')
+    group.addoption('--scales', default='1000',
+                    help='Comma separated show counts the route benchmarks seed, e.g. 1000,100000,1000000.')
+    group.addoption('--genre-scales', default='10000',
+                    help='Comma separated artist counts the genre filter benchmarks seed, e.g. 10000,1000000.')
+
+@contextmanager
+def database():
+    # A fresh schema in TEST_DATABASE_URL (in-memory SQLite by default), with
+    # the in-process caches emptied afterwards.
+    with fyyur_app.app_context():
+        if db.engine.dialect.name == 'postgresql':
+            db.session.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            db.session.commit()
+        db.create_all()
+        try:
+            yield
+        finally:
+            db.session.remove()
+            db.drop_all()
+            fragment_cache.init_app(fyyur_app)
+            autocomplete._tries.clear()
+            search._ngram_indexes.clear()
+
+def run_command(app, command, *args, exit_code=0):
+    # a click command through the CLI runner; returns its output
+    result = app.test_cli_runner().invoke(command, [str(arg) for arg in args])
+    assert result.exit_code == exit_code, result.output
+    return result.output
+
+def run_seed(app, venues, artists, shows, seed=42, days=365, batch_size=5000):
+    # 'flask seed' through the CLI runner, so tests load data exactly as the
+    # command does
+    run_command(app, seed_command, '--venues', venues, '--artists', artists, '--shows', shows,
+                '--seed', seed, '--days', days, '--batch-size', batch_size)
+
+@pytest.fixture
+def app():
+    with database():
+        yield fyyur_app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def seed(app):
+    return lambda venues=10, artists=20, shows=100, **options: run_seed(app, venues, artists, shows, **options)
+
+@pytest.fixture
+def statements(app):
+    # SQL statements sent while the test runs; clear() between requests
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append(statement)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', capture)
+    yield captured
+    event.remove(engine, 'before_cursor_execute', capture)
@@ -0,0 +1,41 @@
+import random
+import re
+from autocomplete import PrefixTrie
+
+WORDS = ('the', 'musical', 'hop', 'hall', 'house', 'jazz', 'jam', 'park', 'square', 'live', 'la', 'a')
+
+def expected(names, prefix, limit):
+    prefix = prefix.lower()
+    matches = [(entity_id, name) for entity_id, name in names.items()
+               if any(name.lower()[match.start():].startswith(prefix) for match in re.finditer(r'\w+', name.lower()))]
+    matches.sort(key=lambda match: (not match[1].lower().startswith(prefix), match[1].lower(), match[0]))
+    return matches[:limit]
+
+def test_complete_returns_the_true_top_k():
+    rng = random.Random(7)
+    trie = PrefixTrie(top_k=5)
+    names = {}
+    for step in range(3000):
+        entity_id = rng.randrange(400)
+        if rng.random() < 0.2:
+            trie.remove(entity_id)
+            names.pop(entity_id, None)
+        else:
+            name = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).title()
+            trie.add(entity_id, name)
+            names[entity_id] = name
+
+        if step % 50 == 0:
+            for prefix in ('h', 'ha', 'ho', 'j', 'la', 'a', 'the', 'x', 'square l'):
+                for limit in (1, 5, 12):
+                    assert trie.complete(prefix, limit) == expected(names, prefix, limit)
+
+def test_removed_names_leave_no_branches():
+    trie = PrefixTrie()
+    trie.add(1, 'La La Land')
+    trie.add(2, 'Lava')
+    trie.remove(1)
+    assert trie.complete('la', 10) == [(2, 'Lava')]
+    trie.remove(2)
+    assert trie.root.children == {}
+    assert trie.root.top == []
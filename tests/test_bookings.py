@@ -0,0 +1,36 @@
+import importlib.util
+import os
+from datetime import datetime, timedelta
+from extensions import db
+from models import Show
+from bookings import SHOW_SLOT_MINUTES, BookingIndex, find_conflict
+
+MIGRATION = os.path.join(os.path.dirname(__file__), '..', 'migrations', 'versions',
+                         'e2a7c95b1d08_show_venue_slot_exclusion.py')
+
+def test_slot_matches_exclusion_constraint():
+    spec = importlib.util.spec_from_file_location('slot_migration', MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    assert migration.SLOT == f"interval '{SHOW_SLOT_MINUTES} minutes'"
+
+def test_index_agrees_with_query(seed):
+    seed(venues=2, artists=2, shows=40, days=10)
+    index = BookingIndex()
+    base = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+    for venue_id in (1, 2):
+        for minutes in range(-24 * 60, 24 * 60, 45):
+            start_time = base + timedelta(minutes=minutes)
+            assert index.conflict(venue_id, start_time) == find_conflict(venue_id, start_time)
+
+def test_back_to_back_shows_do_not_conflict(seed):
+    seed(venues=1, artists=1, shows=0)
+    start_time = datetime(2030, 1, 1, 20)
+    db.session.add(Show(venue_id=1, artist_id=1, start_time=start_time))
+    db.session.commit()
+
+    slot = timedelta(minutes=SHOW_SLOT_MINUTES)
+    assert find_conflict(1, start_time + slot) is None
+    assert find_conflict(1, start_time - slot) is None
+    assert find_conflict(1, start_time + slot - timedelta(minutes=1)) == start_time
+    assert BookingIndex().conflict(1, start_time + slot) is None
@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta
+from extensions import db
+from models import Venue
+
+def test_if_none_match(client, seed):
+    seed(venues=3, artists=3, shows=6)
+    response = client.get('/venues')
+    assert response.status_code == 200
+
+    revalidated = client.get('/venues', headers={"If-None-Match": response.headers["ETag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == response.headers["ETag"]
+
+def test_if_modified_since(client, seed):
+    seed(venues=3, artists=3, shows=6)
+    response = client.get('/venues')
+    last_modified = response.headers["Last-Modified"]
+
+    assert client.get('/venues', headers={"If-Modified-Since": last_modified}).status_code == 304
+
+    # a write newer than the header date (HTTP dates only have seconds)
+    db.session.add(Venue(name='Later Venue', city='Austin', state='TX', genres=['Jazz'],
+                         updated_at=datetime.utcnow() + timedelta(seconds=5)))
+    db.session.commit()
+    assert client.get('/venues', headers={"If-Modified-Since": last_modified}).status_code == 200
+
+def test_if_none_match_takes_precedence(client, seed):
+    seed(venues=3, artists=3, shows=6)
+    last_modified = client.get('/venues').headers["Last-Modified"]
+    response = client.get('/venues', headers={"If-None-Match": '"stale"', "If-Modified-Since": last_modified})
+    assert response.status_code == 200
@@ -0,0 +1,24 @@
+from logging import FileHandler
+import pytest
+from config import get_config, ProductionConfig, DevelopmentConfig
+
+def test_unset_config_is_production(monkeypatch):
+    monkeypatch.delenv('FYYUR_CONFIG', raising=False)
+    monkeypatch.setattr(ProductionConfig, 'SECRET_KEY', 'from-the-environment')
+    config = get_config()
+    assert config is ProductionConfig
+    assert not config.DEBUG
+
+def test_production_needs_a_secret_key(monkeypatch):
+    monkeypatch.delenv('FYYUR_CONFIG', raising=False)
+    monkeypatch.setattr(ProductionConfig, 'SECRET_KEY', None)
+    with pytest.raises(RuntimeError, match='SECRET_KEY must be set'):
+        get_config()
+
+def test_development_is_opt_in(monkeypatch):
+    monkeypatch.setenv('FYYUR_CONFIG', 'development')
+    assert get_config() is DevelopmentConfig
+
+def test_tests_do_not_write_error_log(app):
+    assert app.testing
+    assert not any(isinstance(handler, FileHandler) for handler in app.logger.handlers)
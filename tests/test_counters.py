@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+from extensions import db
+from models import Venue, Artist, Show, ShowRollover
+from commands.counters import counters_cli
+import counters
+from tests.conftest import run_command
+
+def stored(model):
+    return dict((entity_id, (upcoming, past)) for entity_id, upcoming, past in
+                db.session.query(model.id, model.upcoming_shows_count, model.past_shows_count))
+
+def test_rollover_moves_started_shows_to_past(app, seed):
+    seed(venues=3, artists=4, shows=60, days=30)
+    assert 'Rolled over 0 shows.' in run_command(app, counters_cli, 'rollover')
+
+    # rewind the watermark a week, as if the last run was then
+    week_ago = datetime.now() - timedelta(days=7)
+    ShowRollover.query.one().rolled_over_at = week_ago
+    for model in (Venue, Artist):
+        counters.recount(model, [row[0] for row in db.session.query(model.id)])
+    db.session.commit()
+    started = Show.query.filter(Show.start_time > week_ago, Show.start_time <= datetime.now()).count()
+    assert started
+
+    output = run_command(app, counters_cli, 'rollover')
+    assert f'Rolled over {started} shows.' in output
+    assert 'All counters match.' in run_command(app, counters_cli, 'check')
+
+def test_check_reports_and_fixes_drift(app, seed):
+    seed(venues=3, artists=4, shows=60, days=30)
+    expected = stored(Venue)
+    Venue.query.filter_by(id=2).update({"upcoming_shows_count": 99})
+    db.session.commit()
+
+    output = run_command(app, counters_cli, 'check', exit_code=1)
+    assert f'Venue 2: stored upcoming/past {(99, expected[2][1])}, actual {expected[2]}' in output
+    assert '1 counters are out of date' in output
+
+    assert 'Fixed 1 counters.' in run_command(app, counters_cli, 'check', '--fix')
+    assert stored(Venue) == expected
+    assert 'All counters match.' in run_command(app, counters_cli, 'check')
+
+def test_orm_writes_keep_counters_in_step(app, seed):
+    seed(venues=2, artists=2, shows=20, days=30)
+    db.session.add(Show(venue_id=1, artist_id=2, start_time=datetime(2040, 1, 1, 20)))
+    db.session.delete(Show.query.filter_by(venue_id=2).first())
+    db.session.commit()
+    assert counters.reconcile(Venue) == []
+    assert counters.reconcile(Artist) == []
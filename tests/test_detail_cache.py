@@ -0,0 +1,43 @@
+from models import Show
+
+def test_cached_artist_page_runs_no_queries(client, seed, statements):
+    seed(venues=3, artists=3, shows=20)
+    first = client.get('/artists/2')
+    assert first.status_code == 200
+
+    statements.clear()
+    second = client.get('/artists/2')
+    assert second.data == first.data
+    # only the conditional GET fingerprint
+    assert len(statements) == 1
+
+def test_renamed_artist_updates_title(client, seed):
+    seed(venues=3, artists=3, shows=20)
+    client.get('/artists/2')
+    client.post('/artists/2/edit', data={"name": "Renamed Artist", "city": "Austin", "state": "TX",
+                                         "phone": "512-555-0100", "genres": ["Jazz"]})
+    assert b'<title>Renamed Artist | Artist' in client.get('/artists/2').data
+
+def test_missing_entities_are_404(client, seed):
+    seed(venues=1, artists=1, shows=0)
+    assert client.get('/artists/99').status_code == 404
+    assert client.get('/venues/99').status_code == 404
+
+def test_delete_cascades_to_shows(client, seed):
+    seed(venues=2, artists=2, shows=30)
+    shows = Show.query.filter_by(venue_id=1).count()
+    assert shows
+
+    assert client.delete('/venues/1').status_code == 200
+    assert Show.query.filter_by(venue_id=1).count() == 0
+    assert Show.query.count() == 30 - shows
+
+def test_artist_name_is_escaped_in_title(client, seed):
+    seed(venues=1, artists=1, shows=0)
+    client.post('/artists/1/edit', data={"name": "<script>alert(1)</script>", "city": "Austin", "state": "TX",
+                                         "phone": "512-555-0100", "genres": ["Jazz"]})
+    # rendered once on the miss, then from the cache
+    for _ in range(2):
+        page = client.get('/artists/1').data
+        assert b'<script>alert(1)</script>' not in page
+        assert b'<title>&lt;script&gt;alert(1)&lt;/script&gt; | Artist' in page
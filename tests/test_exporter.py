@@ -0,0 +1,73 @@
+import csv
+import gzip
+import json
+from datetime import datetime
+import pytest
+from extensions import db
+from models import Venue, Artist, Show
+from commands.exporter import export_command
+from commands.importer import import_command
+from tests.conftest import run_command
+
+def read_export(path):
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as source:
+        if '.csv' in str(path):
+            return list(csv.DictReader(source))
+        return [json.loads(line) for line in source]
+
+def profile(entity):
+    return (entity.name, entity.city, entity.state, entity.phone, entity.genres, entity.genre_mask,
+            entity.image_link, entity.facebook_link, entity.website_link, entity.seeking_description)
+
+@pytest.mark.parametrize('fmt', ['csv', 'jsonl'])
+def test_exported_shows_import_again(app, seed, tmp_path, fmt):
+    seed(venues=3, artists=5, shows=40, days=30)
+    before = sorted(db.session.query(Show.venue_id, Show.artist_id, Show.start_time))
+    upcoming = dict(db.session.query(Venue.id, Venue.upcoming_shows_count))
+    output = tmp_path / f'shows.{fmt}.gz'
+    run_command(app, export_command, 'shows', '--format', fmt, '--output', output)
+
+    Show.query.delete()
+    db.session.commit()
+    source = tmp_path / f'shows.{fmt}'
+    source.write_bytes(gzip.decompress(output.read_bytes()))
+    assert 'Done: 40 shows imported' in run_command(app, import_command, 'shows', source)
+
+    assert sorted(db.session.query(Show.venue_id, Show.artist_id, Show.start_time)) == before
+    assert dict(db.session.query(Venue.id, Venue.upcoming_shows_count)) == upcoming
+
+@pytest.mark.parametrize('kind, model', [('venues', Venue), ('artists', Artist)])
+@pytest.mark.parametrize('fmt', ['csv', 'jsonl'])
+def test_exported_profiles_import_again(app, seed, tmp_path, kind, model, fmt):
+    seed(venues=4, artists=4, shows=0)
+    originals = model.query.order_by(model.id).all()
+    expected = [profile(entity) for entity in originals]
+    seeking = [entity.seeking_talent if model is Venue else entity.seeking_venues for entity in originals]
+    output = tmp_path / f'{kind}.{fmt}.gz'
+    run_command(app, export_command, kind, '--format', fmt, '--output', output)
+
+    source = tmp_path / f'{kind}.{fmt}'
+    source.write_bytes(gzip.decompress(output.read_bytes()))
+    assert f'Done: 4 {kind} imported' in run_command(app, import_command, kind, source)
+
+    copies = model.query.filter(model.id > originals[-1].id).order_by(model.id).all()
+    assert [profile(entity) for entity in copies] == expected
+    assert [entity.seeking_talent if model is Venue else entity.seeking_venues for entity in copies] == seeking
+
+def test_export_watermark_writes_only_changed_rows(app, seed, tmp_path):
+    seed(venues=3, artists=1, shows=0)
+    watermark = tmp_path / 'venues.watermark.json'
+
+    def export(name):
+        output = tmp_path / f'{name}.jsonl.gz'
+        run_command(app, export_command, 'venues', '--watermark', watermark, '--output', output)
+        return [row["id"] for row in read_export(output)]
+
+    assert export('first') == [1, 2, 3]
+    assert export('unchanged') == []
+
+    venue = Venue.query.get(2)
+    venue.updated_at = datetime.utcnow().replace(year=datetime.utcnow().year + 1)
+    db.session.commit()
+    assert export('changed') == [2]
+    assert json.loads(watermark.read_text())["id"] == 3
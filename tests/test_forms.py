@@ -0,0 +1,68 @@
+import random
+import re
+from forms import VenueForm, build_form, _prototypes
+from models import Venue
+from commands.seed import venue_row
+from commands.importer import to_formdata
+
+TOKEN = re.compile(r'name="csrf_token" type="hidden" value="([^"]+)"')
+
+def venue_formdata(**fields):
+    formdata = to_formdata(venue_row(random.Random(1), 1))
+    for key, value in fields.items():
+        formdata.setlist(key, value if isinstance(value, list) else [value])
+    return formdata
+
+def test_built_forms_keep_their_own_data_and_errors(app):
+    with app.test_request_context():
+        valid = build_form(VenueForm, venue_formdata(name='Valid Hall'))
+        invalid = build_form(VenueForm, venue_formdata(name='', state='ZZ', genres=['Jazz', 'Polka']))
+
+        assert not invalid.validate()
+        assert set(invalid.errors) == {'name', 'state', 'genres'}
+        assert valid.validate(), valid.errors
+        assert valid.errors == {}
+        assert valid.name.data == 'Valid Hall'
+        assert invalid.name.data == ''
+
+        prototype = _prototypes[VenueForm, False]
+        assert prototype.name.data is None
+        assert prototype.name.errors == ()
+        assert valid.name is not prototype.name and valid.name is not invalid.name
+
+def test_failed_submission_renders_again_with_a_csrf_token(app, client):
+    app.config['WTF_CSRF_ENABLED'] = True
+    try:
+        token = TOKEN.search(client.get('/venues/create').get_data(as_text=True)).group(1)
+
+        formdata = venue_formdata(name='Second Try Hall', state='ZZ', csrf_token=token)
+        response = client.post('/venues/create', data=formdata)
+        page = response.get_data(as_text=True)
+        assert response.status_code == 200
+        assert 'Error in state' in page
+        assert 'value="Second Try Hall"' in page
+
+        # the re-rendered form carries a token the next submission passes with
+        formdata = venue_formdata(name='Second Try Hall', csrf_token=TOKEN.search(page).group(1))
+        assert client.post('/venues/create', data=formdata).status_code == 200
+        assert Venue.query.filter_by(name='Second Try Hall').count() == 1
+    finally:
+        app.config['WTF_CSRF_ENABLED'] = False
+
+def test_edit_submission_validates_like_create(app, client, seed):
+    seed(venues=1, artists=1, shows=0)
+    app.config['WTF_CSRF_ENABLED'] = True
+    try:
+        token = TOKEN.search(client.get('/venues/1/edit').get_data(as_text=True)).group(1)
+
+        response = client.post('/venues/1/edit', data=venue_formdata(state='ZZ', csrf_token=token))
+        page = response.get_data(as_text=True)
+        assert response.status_code == 200
+        assert 'Error in state' in page
+        assert TOKEN.search(page)
+
+        response = client.post('/venues/1/edit', data=venue_formdata(name='Renamed Hall', csrf_token=token))
+        assert response.status_code == 302
+        assert Venue.query.get(1).name == 'Renamed Hall'
+    finally:
+        app.config['WTF_CSRF_ENABLED'] = False
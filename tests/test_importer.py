@@ -0,0 +1,48 @@
+import csv
+import json
+from models import Venue, Show
+from search import search_entities
+from commands.importer import import_command
+from tests.conftest import run_command
+
+def write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as target:
+        writer = csv.DictWriter(target, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+def test_import_rejects_invalid_rows_and_batches_the_rest(app, seed, tmp_path):
+    seed(venues=1, artists=1, shows=0)
+    rows = [{"artist_id": 1, "venue_id": 1, "start_time": f'2031-01-{day:02d} 20:00:00'} for day in range(1, 6)]
+    rows += [
+        {"artist_id": 1, "venue_id": 9, "start_time": '2031-02-01 20:00:00'},
+        {"artist_id": 1, "venue_id": 1, "start_time": '2031-01-01 21:00:00'},
+        {"artist_id": 1, "venue_id": 1, "start_time": '2031-01-06T20:00:00'},
+    ]
+    source = tmp_path / 'shows.csv'
+    write_csv(source, rows)
+    rejects = tmp_path / 'rejects.jsonl'
+
+    output = run_command(app, import_command, 'shows', source, '--batch-size', 2, '--rejects', rejects)
+    assert '2 shows imported' in output and '4 shows imported' in output
+    assert 'Done: 5 shows imported' in output
+    assert Show.query.count() == 5
+    assert Venue.query.get(1).upcoming_shows_count == 5
+
+    rejected = [json.loads(line) for line in rejects.read_text().splitlines()]
+    assert [(reject["line"], sorted(reject["errors"])) for reject in rejected] == [
+        (6, ['venue_id']), (7, ['start_time']), (8, ['start_time'])
+    ]
+
+def test_imported_names_are_searchable(app, seed, tmp_path):
+    seed(venues=3, artists=1, shows=0)
+    assert search_entities(Venue, 'Quayside')[0] == 0
+
+    source = tmp_path / 'venues.jsonl'
+    source.write_text(json.dumps({
+        "name": 'Quayside Hall', "city": 'Austin', "state": 'TX', "address": '1 Main St',
+        "phone": '512-555-0100', "genres": ['Jazz']
+    }) + '\n')
+    run_command(app, import_command, 'venues', source)
+    count, venues = search_entities(Venue, 'Quayside')
+    assert count == 1 and venues[0][1] == 'Quayside Hall'
@@ -0,0 +1,57 @@
+import pytest
+from flask import Flask, Response, stream_with_context
+from sqlalchemy.exc import DBAPIError
+from extensions import db, fragment_cache
+from instrumentation import Instrumentation
+
+@pytest.fixture
+def instrumented():
+    # a bare app, so the hooks do not stay registered on the shared one
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI='sqlite://',
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        INSTRUMENTATION_ENABLED=True
+    )
+    db.init_app(app)
+    fragment_cache.init_app(app)
+
+    @app.route('/failing')
+    def failing():
+        with pytest.raises(DBAPIError):
+            db.session.execute('SELECT * FROM no_such_table')
+        db.session.rollback()
+        db.session.execute('SELECT 1')
+        return 'ok'
+
+    @app.route('/streamed')
+    def streamed():
+        def generate():
+            for number in range(3):
+                yield str(db.session.execute(f'SELECT {number}').scalar())
+        return Response(stream_with_context(generate()))
+
+    instrumentation = Instrumentation(app)
+    yield app, instrumentation
+    with app.app_context():
+        db.session.remove()
+
+def test_failed_statement_is_timed_and_released(instrumented):
+    app, instrumentation = instrumented
+    response = app.test_client().get('/failing')
+    assert 'desc="2 queries"' in response.headers['Server-Timing']
+    assert instrumentation.totals['failing']['sql_statements_total'] == 2
+
+    with app.app_context():
+        connection = db.session.connection()
+        assert not connection.info.get('_query_started')
+
+def test_streamed_statements_are_recorded_on_close(instrumented):
+    app, instrumentation = instrumented
+    response = app.test_client().get('/streamed', buffered=False)
+    assert instrumentation.totals['streamed']['requests_total'] == 0
+
+    assert response.get_data() == b'012'
+    response.close()
+    assert instrumentation.totals['streamed']['requests_total'] == 1
+    assert instrumentation.totals['streamed']['sql_statements_total'] == 3
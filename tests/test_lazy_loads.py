@@ -0,0 +1,47 @@
+# Relationships are lazy='raise_on_sql' and TESTING propagates exceptions, so
+# a route touching a relationship it did not load fails here.
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import inspect
+from app import app as fyyur_app
+from models import Venue, Artist, Show
+
+ARGUMENTS = {"venue_id": 1, "artist_id": 1, "entity_id": 1, "resource": "venues"}
+QUERY_STRINGS = {"autocomplete.autocomplete": "?type=artist&q=a", "search.search": "?search_term=a"}
+
+def get_urls():
+    adapter = fyyur_app.url_map.bind('localhost')
+    for rule in sorted(fyyur_app.url_map.iter_rules(), key=lambda rule: rule.rule):
+        if 'GET' in rule.methods and rule.endpoint != 'static':
+            values = {name: ARGUMENTS[name] for name in rule.arguments}
+            yield adapter.build(rule.endpoint, values) + QUERY_STRINGS.get(rule.endpoint, '')
+
+def test_relationships_raise_on_lazy_load():
+    for model in (Venue, Artist, Show):
+        for relationship in inspect(model).relationships:
+            assert relationship.lazy == 'raise_on_sql', relationship
+
+@pytest.mark.parametrize('url', list(get_urls()))
+def test_get_routes(client, seed, url):
+    seed(venues=5, artists=5, shows=40)
+    assert client.get(url).status_code == 200
+
+@pytest.mark.parametrize('url', ['/venues/search', '/artists/search'])
+def test_search_routes(client, seed, url):
+    seed(venues=5, artists=5, shows=40)
+    assert client.post(url, data={"search_term": "e"}).status_code == 200
+
+def test_write_routes(client, seed):
+    seed(venues=5, artists=5, shows=0)
+    profile = {"city": "Austin", "state": "TX", "phone": "512-555-0100", "genres": ["Jazz"]}
+
+    assert client.post('/venues/create', data=dict(profile, name='New Venue', address='1 Main St')).status_code == 200
+    assert client.post('/artists/create', data=dict(profile, name='New Artist')).status_code == 200
+    start_time = (datetime.now() + timedelta(days=3)).strftime('%Y-%m-%d %H:%M:%S')
+    assert client.post('/shows/create', data={"venue_id": 1, "artist_id": 1, "start_time": start_time}).status_code == 200
+    assert client.post('/venues/2/edit', data=dict(profile, name='Renamed Venue', address='2 Main St')).status_code in (200, 302)
+    assert client.post('/artists/2/edit', data=dict(profile, name='Renamed Artist')).status_code in (200, 302)
+
+    assert client.delete('/venues/1').status_code == 200
+    assert client.delete('/artists/1').status_code == 200
+    assert client.delete('/api/v1/venues', json={"ids": [3, 4]}).status_code == 200
@@ -0,0 +1,30 @@
+from extensions import db
+from models import Artist
+
+def walk(client, url):
+    # ids on every page following next links, then back along prev links
+    forward, pages = [], []
+    page = client.get(url).get_json()
+    while True:
+        pages.append(page)
+        forward.extend(row["id"] for row in page["data"])
+        if not page["next"]:
+            break
+        page = client.get(page["next"]).get_json()
+
+    backward = []
+    while page["prev"]:
+        page = client.get(page["prev"]).get_json()
+        backward = [row["id"] for row in page["data"]] + backward
+    return forward, backward + [row["id"] for row in pages[-1]["data"]]
+
+def test_artist_pages_cover_every_row_once(client, seed):
+    seed(venues=1, artists=23, shows=0)
+    # duplicate names are ordered by id
+    db.session.add_all([Artist(name='Zed', state='CA'), Artist(name='Zed', state='CA'), Artist(name='', state='CA')])
+    db.session.commit()
+
+    forward, backward = walk(client, '/artists?format=json&limit=5')
+    expected = [artist.id for artist in Artist.query.order_by(Artist.name, Artist.id)]
+    assert forward == expected
+    assert backward == expected
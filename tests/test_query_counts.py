@@ -0,0 +1,26 @@
+# Each page must run the same number of SQL statements however many rows
+# it lists, so an N+1 query fails here instead of in production.
+import pytest
+
+def statement_count(client, statements, url):
+    statements.clear()
+    response = client.get(url)
+    assert response.status_code == 200
+    return len(statements)
+
+@pytest.mark.parametrize('url', ['/venues', '/artists', '/shows'])
+def test_listing_query_count_is_constant(client, seed, statements, url):
+    seed(venues=3, artists=3, shows=6)
+    small = statement_count(client, statements, url)
+
+    # the pages now list PAGE_SIZE rows instead of a handful
+    seed(venues=60, artists=60, shows=300, seed=7)
+    assert statement_count(client, statements, url) == small
+
+@pytest.mark.parametrize('kind', ['venues', 'artists'])
+def test_detail_query_count_is_constant(client, seed, statements, kind):
+    # 200 shows over 5 venues and 5 artists: every page lists a different
+    # number of past and upcoming shows
+    seed(venues=5, artists=5, shows=200)
+    counts = {statement_count(client, statements, f'/{kind}/{entity_id}') for entity_id in range(1, 6)}
+    assert len(counts) == 1
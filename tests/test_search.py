@@ -0,0 +1,12 @@
+from models import Venue, Artist
+
+def test_search_reports_stored_upcoming_counts(client, seed):
+    seed(venues=8, artists=8, shows=80)
+    response = client.get('/search?format=json&search_term=e').get_json()
+
+    for key, model in (("venues", Venue), ("artists", Artist)):
+        stored = dict(model.query.with_entities(model.id, model.upcoming_shows_count))
+        assert response[key]["data"]
+        for row in response[key]["data"]:
+            assert row["num_upcoming_shows"] == stored[row["id"]]
+        assert any(row["num_upcoming_shows"] for row in response[key]["data"])